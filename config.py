@@ -10,7 +10,7 @@
     api_key = settings.api_key
     redis_url = settings.redis_url
 """
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -70,14 +70,14 @@ class Settings(BaseSettings):
     analysis_proxy_url: Optional[str] = "https://tripple-f.zeabur.app"  # shioaji-proxy API URL
     analysis_timeout: float = 10.0  # 請求超時時間（秒）
 
-    @property
+    @cached_property
     def supported_futures_list(self) -> list[str]:
-        """取得支援的期貨商品列表"""
+        """取得支援的期貨商品列表（解析結果快取於實例上）"""
         return [f.strip() for f in self.supported_futures.split(",") if f.strip()]
 
-    @property
+    @cached_property
     def supported_options_list(self) -> list[str]:
-        """取得支援的選擇權商品列表"""
+        """取得支援的選擇權商品列表（解析結果快取於實例上）"""
         return [o.strip() for o in self.supported_options.split(",") if o.strip()]
 
     def validate_shioaji_credentials(self) -> bool:
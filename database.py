@@ -1,9 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from config import settings
 
-engine = create_engine(settings.database_url)
+# 批次 INSERT 時每個多值 INSERT 語句最多包含的筆數
+_engine_options = {"insertmanyvalues_page_size": 1000}
+if make_url(settings.database_url).get_driver_name() == "psycopg2":
+    # psycopg2: INSERT 走 insertmanyvalues，其餘 executemany 走 execute_batch
+    _engine_options["executemany_mode"] = "values_plus_batch"
+
+engine = create_engine(settings.database_url, **_engine_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -14,4 +21,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
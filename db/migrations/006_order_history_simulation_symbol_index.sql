@@ -0,0 +1,7 @@
+-- order_history 複合索引：模式 + 商品 + 建立時間
+-- Version: 006
+
+-- GET /orders 依模式與商品篩選後以 created_at DESC 排序分頁，
+-- 單欄 simulation 索引仍需掃描該模式下所有訂單再排序
+CREATE INDEX IF NOT EXISTS idx_order_history_simulation_symbol_created
+    ON order_history (simulation, symbol, created_at DESC);
@@ -13,7 +13,7 @@ K 線合成器
 import logging
 from collections import deque
 from dataclasses import dataclass, field, asdict
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Callable, Optional, Deque
 
 logger = logging.getLogger(__name__)
@@ -60,6 +60,7 @@ class KLineBuilder:
         max_history: int = 50,
     ):
         self.interval_minutes = interval_minutes
+        self._interval = timedelta(minutes=interval_minutes)
         self.on_complete = on_complete
         self.history: Deque[KLine] = deque(maxlen=max_history)
 
@@ -67,6 +68,8 @@ class KLineBuilder:
         self._current: Optional[KLine] = None
         # 當前 K 線所屬的時間邊界
         self._current_boundary: Optional[datetime] = None
+        # 當前 K 線的結束時間（= 時間邊界 + 週期）
+        self._current_end: Optional[datetime] = None
 
     def _get_boundary(self, ts: datetime) -> datetime:
         """
@@ -101,7 +104,14 @@ class KLineBuilder:
             volume: 成交量
             timestamp: tick 時間戳
         """
-        boundary = self._get_boundary(timestamp)
+        # 快速路徑：tick 仍落在當前 K 線區間內時，不需重新計算時間邊界
+        if (
+            self._current_end is not None
+            and self._current_boundary <= timestamp < self._current_end
+        ):
+            boundary = self._current_boundary
+        else:
+            boundary = self._get_boundary(timestamp)
 
         # 第一筆 tick 或進入新的時間邊界 → 完成前一根 K 線，開始新的
         if self._current_boundary is None or boundary > self._current_boundary:
@@ -119,24 +129,23 @@ class KLineBuilder:
                 start_time=boundary,
             )
             self._current_boundary = boundary
+            self._current_end = boundary + self._interval
         else:
-            # 更新當前 K 線
-            self._current.high = max(self._current.high, price)
-            self._current.low = min(self._current.low, price)
-            self._current.close = price
-            self._current.volume += volume
+            # 更新當前 K 線（以比較取代 max/min 呼叫，high >= low 恆成立故可用 elif）
+            current = self._current
+            if price > current.high:
+                current.high = price
+            elif price < current.low:
+                current.low = price
+            current.close = price
+            current.volume += volume
 
     def _finalize_current(self) -> None:
         """完成當前 K 線，加入歷史並觸發回調"""
         if self._current is None:
             return
 
-        self._current.end_time = self._current_boundary.replace(
-            minute=(self._current_boundary.minute + self.interval_minutes) % 60,
-            hour=self._current_boundary.hour + (
-                self._current_boundary.minute + self.interval_minutes
-            ) // 60,
-        )
+        self._current.end_time = self._current_end
 
         completed = self._current
         self.history.append(completed)
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from decimal import Decimal
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Numeric, JSON
+from sqlalchemy import Column, Index, Integer, BigInteger, String, DateTime, Float, Numeric, JSON
 import enum
 
 from database import Base
@@ -49,6 +49,16 @@ class OrderHistory(Base):
     cancel_quantity = Column(Integer, nullable=True)  # Cancelled quantity
     updated_at = Column(DateTime, nullable=True)  # Last status update time
 
+    __table_args__ = (
+        # 依模式 + 商品篩選並以建立時間排序（對應 migration 006）
+        Index(
+            "idx_order_history_simulation_symbol_created",
+            "simulation",
+            "symbol",
+            created_at.desc(),
+        ),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -82,7 +92,7 @@ class QuoteHistory(Base):
     code = Column(String(32), nullable=False, index=True)  # 交易所代碼 (如 MXFA6)
     quote_type = Column(String(10), nullable=False)  # "tick" 或 "bidask"
 
-    # 價格欄位
+    # 價格欄位（維持 Numeric 保留兩位小數精度；float32 REAL 只有約 7 位有效數字）
     close_price = Column(Numeric(12, 2), nullable=True)
     open_price = Column(Numeric(12, 2), nullable=True)
     high_price = Column(Numeric(12, 2), nullable=True)
@@ -100,7 +110,8 @@ class QuoteHistory(Base):
     buy_volume = Column(Integer, nullable=True)
     sell_volume = Column(Integer, nullable=True)
 
-    # 時間戳
+    # 時間戳（PostgreSQL 的 TIMESTAMPTZ 內部即為 8 bytes 微秒整數，與 BIGINT epoch-ms 同寬，
+    # 且可直接用於時間範圍查詢與 API 輸出，因此不另存整數時間戳）
     quote_time = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
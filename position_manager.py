@@ -12,16 +12,40 @@
 import json
 import logging
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
+from enum import IntEnum
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 為選用加速套件
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+class Side(IntEnum):
+    """持倉方向的數值表示（損益 = side × 價差）"""
+    FLAT = 0
+    LONG = 1
+    SHORT = -1
+
+
+# 方向字串 → Side 對照表（未知方向視為空倉）
+_DIRECTION_TO_SIDE = {
+    "long": Side.LONG,
+    "short": Side.SHORT,
+    "flat": Side.FLAT,
+}
+
+
+@dataclass(frozen=True, slots=True)
 class PositionState:
     """
-    持倉狀態（可序列化）
+    持倉狀態（可序列化、不可變）
+
+    狀態變更一律透過 dataclasses.replace 產生新實例，
+    因此可安全地在執行緒間傳遞而不需複製。
     """
     direction: str = "flat"  # "long", "short", "flat"
     entry_price: float = 0.0
@@ -30,12 +54,16 @@ class PositionState:
     last_sync_time: float = 0.0
 
     def to_json(self) -> str:
-        """序列化為 JSON"""
+        """序列化為 JSON（有安裝 orjson 時使用 orjson）"""
+        if orjson is not None:
+            return orjson.dumps(asdict(self)).decode()
         return json.dumps(asdict(self))
 
     @classmethod
     def from_json(cls, data: str) -> "PositionState":
         """從 JSON 反序列化"""
+        if orjson is not None:
+            return cls(**orjson.loads(data))
         return cls(**json.loads(data))
 
 
@@ -66,6 +94,11 @@ class PositionManager:
         """當前持倉方向"""
         return self.state.direction
 
+    @property
+    def side(self) -> Side:
+        """當前持倉方向（數值形式）"""
+        return _DIRECTION_TO_SIDE.get(self.state.direction, Side.FLAT)
+
     @property
     def is_flat(self) -> bool:
         """是否無持倉"""
@@ -84,10 +117,13 @@ class PositionManager:
             direction: 持倉方向 ("long" 或 "short")
             entry_price: 進場價格
         """
-        self.state.direction = direction
-        self.state.entry_price = entry_price
-        self.state.quantity = self.default_quantity
-        self.state.unrealized_pnl = 0.0
+        self.state = replace(
+            self.state,
+            direction=direction,
+            entry_price=entry_price,
+            quantity=self.default_quantity,
+            unrealized_pnl=0.0,
+        )
 
         logger.info(
             f"開倉: {direction} {self.symbol} x{self.default_quantity} @ {entry_price}"
@@ -103,22 +139,14 @@ class PositionManager:
         Returns:
             實現損益（點數）
         """
-        if self.state.direction == "long":
-            pnl = exit_price - self.state.entry_price
-        elif self.state.direction == "short":
-            pnl = self.state.entry_price - exit_price
-        else:
-            pnl = 0.0
+        pnl = self.side * (exit_price - self.state.entry_price)
 
         logger.info(
             f"平倉: {self.state.direction} {self.symbol} "
             f"@ {exit_price} 損益={pnl:.1f} 點"
         )
 
-        self.state.direction = "flat"
-        self.state.entry_price = 0.0
-        self.state.quantity = 0
-        self.state.unrealized_pnl = 0.0
+        self._reset_to_flat()
 
         return pnl
 
@@ -132,14 +160,10 @@ class PositionManager:
         Returns:
             未實現損益（點數）
         """
-        if self.state.direction == "long":
-            self.state.unrealized_pnl = current_price - self.state.entry_price
-        elif self.state.direction == "short":
-            self.state.unrealized_pnl = self.state.entry_price - current_price
-        else:
-            self.state.unrealized_pnl = 0.0
+        pnl = self.side * (current_price - self.state.entry_price)
 
-        return self.state.unrealized_pnl
+        self.state = replace(self.state, unrealized_pnl=pnl)
+        return pnl
 
     def should_sync(self) -> bool:
         """
@@ -165,7 +189,7 @@ class PositionManager:
         Returns:
             是否發生同步修正
         """
-        self.state.last_sync_time = time.time()
+        self.state = replace(self.state, last_sync_time=time.time())
 
         # 從券商持倉中找到匹配的商品
         matched = None
@@ -184,10 +208,7 @@ class PositionManager:
                 logger.warning(
                     f"同步修正: 本地持倉 {self.state.direction} 但券商無持倉，強制平倉"
                 )
-                self.state.direction = "flat"
-                self.state.entry_price = 0.0
-                self.state.quantity = 0
-                self.state.unrealized_pnl = 0.0
+                self._reset_to_flat()
                 return True
             return False
 
@@ -199,13 +220,26 @@ class PositionManager:
             logger.warning(
                 f"同步修正: 本地 {self.state.direction} → 券商 {broker_direction}"
             )
-            self.state.direction = broker_direction
-            self.state.entry_price = matched.get("price", 0.0)
-            self.state.quantity = broker_qty
+            self.state = replace(
+                self.state,
+                direction=broker_direction,
+                entry_price=matched.get("price", 0.0),
+                quantity=broker_qty,
+            )
             return True
 
         return False
 
+    def _reset_to_flat(self) -> None:
+        """重設為空倉（保留最後同步時間）"""
+        self.state = replace(
+            self.state,
+            direction="flat",
+            entry_price=0.0,
+            quantity=0,
+            unrealized_pnl=0.0,
+        )
+
     def get_state(self) -> PositionState:
         """取得當前持倉狀態"""
         return self.state
@@ -9,18 +9,21 @@ QuoteStorage - 報價資料批次寫入器
 - 錯誤重試機制
 - 可透過設定開關啟用/停用
 """
+import csv
+import io
 import logging
+import math
 import threading
 import time
-from collections import deque
+from queue import Empty, SimpleQueue
 from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Optional, Dict, Any
 
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
 from config import settings
-from database import SessionLocal
+from database import engine
 from models import QuoteHistory
 
 logger = logging.getLogger(__name__)
@@ -28,6 +31,56 @@ logger = logging.getLogger(__name__)
 # 最大重試次數
 MAX_WRITE_RETRIES = 3
 
+_UTC = timezone.utc
+
+# quote_history 為只新增的時序資料表，直接使用 Core INSERT（不經過 ORM/Session）
+_QUOTE_INSERT = QuoteHistory.__table__.insert()
+
+# PostgreSQL (psycopg2) 改用 COPY FROM STDIN 寫入；id 由 BIGSERIAL、
+# created_at 由資料庫預設值 CURRENT_TIMESTAMP 產生
+_COPY_COLUMNS = tuple(
+    column.name
+    for column in QuoteHistory.__table__.columns
+    if column.name not in ("id", "created_at")
+)
+_COPY_ROW = itemgetter(*_COPY_COLUMNS)
+_COPY_SQL = (
+    f"COPY {QuoteHistory.__tablename__} ({', '.join(_COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+# 刷新耗時與報價到達率的指數移動平均權重
+FLUSH_EWMA_ALPHA = 0.3
+
+
+def _copy_records(conn, records: list) -> None:
+    """
+    以 COPY FROM STDIN（CSV 格式）批次寫入報價記錄（僅適用 psycopg2）
+
+    None 輸出為空欄位，COPY 會將其視為 NULL。記錄已由 add_quote 端的
+    _create_quote_record 建好完整欄位，這裡以 map + itemgetter 交給 csv 模組
+    逐列輸出，刷新執行緒不再逐筆執行 Python 程式碼。
+    """
+    buf = io.StringIO()
+    csv.writer(buf).writerows(map(_COPY_ROW, records))
+    buf.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(_COPY_SQL, buf)
+    except conn.dialect.dbapi.Error as e:
+        # 包裝為 SQLAlchemy 例外，讓 _flush_buffer 走相同的重試流程
+        raise DBAPIError(_COPY_SQL, None, e) from e
+    finally:
+        cursor.close()
+
+
+def _ewma(previous: Optional[float], sample: float) -> float:
+    """指數移動平均（首筆觀測值直接採用）"""
+    if previous is None:
+        return sample
+    return previous + FLUSH_EWMA_ALPHA * (sample - previous)
+
 
 class QuoteStorage:
     """
@@ -58,13 +111,16 @@ class QuoteStorage:
         self._flush_interval = flush_interval or settings.quote_storage_flush_interval
         self._enabled = enabled if enabled is not None else settings.quote_storage_enabled
 
-        # 緩衝區和鎖
-        self._buffer: deque = deque()
-        self._lock = threading.Lock()
+        # 緩衝區（SimpleQueue 以 C 實作，多個報價回調執行緒寫入時不需額外加鎖）
+        self._buffer: SimpleQueue = SimpleQueue()
 
         # 背景執行緒控制
         self._running = False
         self._flush_thread: Optional[threading.Thread] = None
+        # 喚醒背景執行緒（新批次的第一筆報價進來或 stop 時）
+        self._wakeup = threading.Event()
+        # 目前批次第一筆報價進入緩衝區的時間（time.monotonic）
+        self._batch_start_ts: Optional[float] = None
 
         # 統計資訊
         self._total_quotes_stored = 0
@@ -72,6 +128,10 @@ class QuoteStorage:
         self._last_flush_time: Optional[float] = None
         self._consecutive_errors = 0
 
+        # 自動調整刷新間隔用的觀測值（EWMA）
+        self._flush_cost: Optional[float] = None  # 單次非空刷新耗時 F0（秒）
+        self._arrival_rate: Optional[float] = None  # 報價到達率 λ（筆/秒）
+
         if self._enabled:
             self.start()
             logger.info(
@@ -87,6 +147,7 @@ class QuoteStorage:
             return
 
         self._running = True
+        self._wakeup.clear()
         self._flush_thread = threading.Thread(
             target=self._flush_loop,
             name="QuoteStorageFlushThread",
@@ -105,6 +166,7 @@ class QuoteStorage:
             return
 
         self._running = False
+        self._wakeup.set()
 
         # 等待執行緒結束
         if self._flush_thread and self._flush_thread.is_alive():
@@ -132,7 +194,8 @@ class QuoteStorage:
             return False
 
         try:
-            # 驗證必要欄位
+            # 驗證必要欄位（空字串同樣視為缺少；兩次 dict.get 的成本低於
+            # 以 (symbol, code) 快取已驗證合約的集合查詢）
             if not quote_data.get("symbol") or not quote_data.get("code"):
                 logger.warning(f"報價資料缺少必要欄位: {quote_data}")
                 return False
@@ -140,9 +203,12 @@ class QuoteStorage:
             # 建立報價記錄
             quote_record = self._create_quote_record(quote_data)
 
-            with self._lock:
-                self._buffer.append(quote_record)
-                buffer_len = len(self._buffer)
+            self._buffer.put_nowait(quote_record)
+            buffer_len = self._buffer.qsize()
+            if buffer_len == 1:
+                # 緩衝區由空轉為非空：記錄批次起始時間並喚醒背景執行緒
+                self._batch_start_ts = time.monotonic()
+                self._wakeup.set()
 
             # 達到緩衝區大小時觸發刷新
             if buffer_len >= self._buffer_size:
@@ -172,11 +238,15 @@ class QuoteStorage:
         # 解析時間戳
         timestamp = quote_data.get("timestamp", 0)
         if isinstance(timestamp, (int, float)) and timestamp > 0:
-            # 毫秒時間戳轉 datetime
-            quote_time = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+            # 毫秒時間戳轉 datetime（tzinfo 以位置參數傳入模組層級常數）
+            quote_time = datetime.fromtimestamp(timestamp / 1000, _UTC)
         else:
-            quote_time = datetime.now(timezone.utc)
+            quote_time = datetime.now(_UTC)
 
+        # 以單一字典字面值建立記錄：實測比欄位對照表 + 推導式更快。
+        # 不使用預先配置的字典池：CPython 的 dict freelist 已會重複使用記憶體，
+        # 且只含 str/float/int/None/datetime 的字典不受 GC 追蹤，池化反而較慢，
+        # 也可能在寫入資料庫前被覆寫。
         return {
             "symbol": quote_data.get("symbol", ""),
             "code": quote_data.get("code", ""),
@@ -197,41 +267,108 @@ class QuoteStorage:
         }
 
     def _flush_loop(self) -> None:
-        """背景刷新迴圈"""
+        """
+        背景刷新迴圈
+
+        以「批次中最早一筆報價的等待時間」決定刷新時機：第一筆報價進入空緩衝區時
+        開始計時，等待時間達到 _next_flush_wait 的上限即刷新，而不是固定每隔
+        flush_interval 刷新一次。緩衝區為空時阻塞等待，不做空刷新。
+        """
+        last_check = time.monotonic()
+        last_stored = self._total_quotes_stored
         while self._running:
             try:
-                time.sleep(self._flush_interval)
-                if self._running:  # 確認仍在運行
-                    self._flush_buffer()
+                batch_start = self._batch_start_ts
+                if batch_start is None:
+                    woken = self._wakeup.wait(self._flush_interval)
+                    self._wakeup.clear()
+                    # 逾時仍有資料（未經 add_quote 寫入）時直接刷新，否則等待批次起始時間
+                    if woken or self._buffer.empty():
+                        continue
+                else:
+                    remaining = self._next_flush_wait() - (time.monotonic() - batch_start)
+                    if remaining > 0 and self._wakeup.wait(remaining):
+                        # 被 stop 喚醒；若是新批次的喚醒則重新計算
+                        self._wakeup.clear()
+                        continue
+
+                if not self._running:  # 確認仍在運行
+                    break
+
+                t0 = time.monotonic()
+                written = self._flush_buffer()
+                now = time.monotonic()
+
+                # 以累計儲存筆數計算到達率，一併涵蓋緩衝區滿時的即時刷新
+                stored = self._total_quotes_stored
+                self._update_flush_metrics(
+                    written=written,
+                    flush_elapsed=now - t0,
+                    arrived=stored - last_stored,
+                    period=now - last_check,
+                )
+                last_check, last_stored = now, stored
             except Exception as e:
                 logger.error(f"背景刷新迴圈錯誤: {e}")
 
-    def _flush_buffer(self) -> None:
+    def _update_flush_metrics(
+        self, written: int, flush_elapsed: float, arrived: int, period: float
+    ) -> None:
+        """以 EWMA 更新刷新耗時 F0 與報價到達率 λ"""
+        if written:
+            # 空刷新不碰資料庫，不列入刷新耗時
+            self._flush_cost = _ewma(self._flush_cost, flush_elapsed)
+        if period > 0:
+            self._arrival_rate = _ewma(self._arrival_rate, arrived / period)
+
+    def _next_flush_wait(self) -> float:
+        """
+        計算批次中最早一筆報價最多可等待的秒數
+
+        - 尚無觀測值或沒有報價進來：使用設定的 flush_interval
+        - λ > 2/F0：到達率高到緩衝區大小即可觸發刷新，不再提前定時刷新
+        - 其餘情況：取 ski-rental 門檻 sqrt(2·F0/λ)，並至少等待 F0，
+          讓刷新執行緒的忙碌比例不超過約 50%
+
+        結果一律不超過 flush_interval。
+        """
+        cost, rate = self._flush_cost, self._arrival_rate
+        if cost is None or not rate or rate > 2.0 / cost:
+            return self._flush_interval
+        return min(self._flush_interval, max(cost, math.sqrt(2.0 * cost / rate)))
+
+    def _flush_buffer(self) -> int:
         """
         將緩衝區資料批次寫入資料庫
 
         使用重試機制處理暫時性錯誤
-        """
-        # 取出緩衝區所有資料
-        with self._lock:
-            if not self._buffer:
-                return
-            records = list(self._buffer)
-            self._buffer.clear()
 
+        Returns:
+            成功寫入的筆數（緩衝區為空或寫入失敗時為 0）
+        """
+        # 取出緩衝區所有資料（先重置批次起始時間，取出後才進來的報價會開始新批次）
+        self._batch_start_ts = None
+        records = []
+        get = self._buffer.get_nowait
+        try:
+            # 只取出當下已有的筆數，避免持續寫入時刷新無法結束
+            for _ in range(self._buffer.qsize()):
+                records.append(get())
+        except Empty:
+            # 其他刷新執行緒同時取出
+            pass
         if not records:
-            return
+            return 0
 
         # 嘗試批次寫入
         for attempt in range(1, MAX_WRITE_RETRIES + 1):
-            db: Optional[Session] = None
             try:
-                db = SessionLocal()
-
-                # 建立 ORM 物件並批次儲存
-                quote_objects = [QuoteHistory(**record) for record in records]
-                db.bulk_save_objects(quote_objects)
-                db.commit()
+                # engine.begin() 於區塊結束時 commit，發生例外時自動 rollback
+                with engine.begin() as conn:
+                    if conn.dialect.driver == "psycopg2":
+                        _copy_records(conn, records)
+                    else:
+                        conn.execute(_QUOTE_INSERT, records)
 
                 # 更新統計
                 self._total_quotes_stored += len(records)
@@ -243,41 +380,24 @@ class QuoteStorage:
                     f"已儲存 {len(records)} 筆報價 "
                     f"(累計: {self._total_quotes_stored} 筆)"
                 )
-                return
+                return len(records)
 
             except SQLAlchemyError as e:
                 self._consecutive_errors += 1
                 logger.error(
                     f"批次寫入失敗 (嘗試 {attempt}/{MAX_WRITE_RETRIES}): {e}"
                 )
-                if db:
-                    try:
-                        db.rollback()
-                    except Exception:
-                        pass
-
                 if attempt < MAX_WRITE_RETRIES:
                     time.sleep(1.0 * attempt)  # 指數退避
 
             except Exception as e:
                 self._consecutive_errors += 1
                 logger.error(f"非預期的寫入錯誤: {e}")
-                if db:
-                    try:
-                        db.rollback()
-                    except Exception:
-                        pass
                 break
 
-            finally:
-                if db:
-                    try:
-                        db.close()
-                    except Exception:
-                        pass
-
         # 所有重試都失敗，記錄遺失的資料數量
         logger.error(f"批次寫入最終失敗，遺失 {len(records)} 筆報價資料")
+        return 0
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -286,8 +406,7 @@ class QuoteStorage:
         Returns:
             包含統計資訊的字典
         """
-        with self._lock:
-            buffer_size = len(self._buffer)
+        buffer_size = self._buffer.qsize()
 
         return {
             "enabled": self._enabled,
@@ -15,7 +15,13 @@ import json
 import logging
 from dataclasses import dataclass, asdict
 from enum import Enum
-from typing import Optional
+from itertools import islice
+from typing import Iterable, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 為選用加速套件
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -55,12 +61,16 @@ class RiskState:
     halt_reason: str = ""
 
     def to_json(self) -> str:
-        """序列化為 JSON"""
+        """序列化為 JSON（有安裝 orjson 時使用 orjson，直接序列化 dataclass 不經 asdict）"""
+        if orjson is not None:
+            return orjson.dumps(self).decode()
         return json.dumps(asdict(self))
 
     @classmethod
     def from_json(cls, data: str) -> "RiskState":
         """從 JSON 反序列化"""
+        if orjson is not None:
+            return cls(**orjson.loads(data))
         return cls(**json.loads(data))
 
 
@@ -158,7 +168,11 @@ class RiskManager:
         """
         檢查是否觸發停損
 
-        先更新追蹤停損線（只往有利方向移動），再檢查是否觸發。
+        先更新追蹤停損線（只往有利方向移動：多單創新高時上移、空單創新低時
+        下移），再檢查是否觸發。
+
+        每個 tick 都會呼叫，但計算只有幾次浮點比較；改由 Numba 等 JIT 函式處理時，
+        單次呼叫的分派與參數轉換成本會高於計算本身，因此維持純 Python 實作。
 
         Args:
             current_price: 當前價格
@@ -166,65 +180,108 @@ class RiskManager:
         Returns:
             觸發的停損原因，未觸發返回 None
         """
-        if self.state.position_direction == "flat":
-            return None
-
-        # 更新追蹤停損
-        self._update_trailing_stop(current_price)
-
-        direction = self.state.position_direction
-
-        # 檢查固定停損
-        if direction == "long" and current_price <= self.state.stop_loss_price:
-            logger.warning(
-                f"固定停損觸發: 價格 {current_price} <= {self.state.stop_loss_price}"
-            )
-            return StopReason.FIXED_STOP_LOSS
-
-        if direction == "short" and current_price >= self.state.stop_loss_price:
-            logger.warning(
-                f"固定停損觸發: 價格 {current_price} >= {self.state.stop_loss_price}"
-            )
-            return StopReason.FIXED_STOP_LOSS
+        state = self.state
+        direction = state.position_direction
 
-        # 檢查追蹤停損
-        if direction == "long" and current_price <= self.state.trailing_stop_price:
-            logger.warning(
-                f"追蹤停損觸發: 價格 {current_price} <= {self.state.trailing_stop_price}"
-            )
-            return StopReason.TRAILING_STOP
+        # 每個 tick 只判斷一次持倉方向，並直接內嵌追蹤停損的更新
+        if direction == "long":
+            # 更新追蹤停損（價格創新高時上移）
+            if current_price > state.best_price:
+                state.best_price = current_price
+                new_trailing = current_price - self.trailing_stop_points
+                if new_trailing > state.trailing_stop_price:
+                    state.trailing_stop_price = new_trailing
+                    logger.debug(f"追蹤停損上移: {state.trailing_stop_price}")
+
+            # 檢查固定停損
+            if current_price <= state.stop_loss_price:
+                logger.warning(
+                    f"固定停損觸發: 價格 {current_price} <= {state.stop_loss_price}"
+                )
+                return StopReason.FIXED_STOP_LOSS
+
+            # 檢查追蹤停損
+            if current_price <= state.trailing_stop_price:
+                logger.warning(
+                    f"追蹤停損觸發: 價格 {current_price} <= {state.trailing_stop_price}"
+                )
+                return StopReason.TRAILING_STOP
 
-        if direction == "short" and current_price >= self.state.trailing_stop_price:
-            logger.warning(
-                f"追蹤停損觸發: 價格 {current_price} >= {self.state.trailing_stop_price}"
-            )
-            return StopReason.TRAILING_STOP
+        elif direction == "short":
+            # 更新追蹤停損（價格創新低時下移）
+            if current_price < state.best_price:
+                state.best_price = current_price
+                new_trailing = current_price + self.trailing_stop_points
+                if new_trailing < state.trailing_stop_price:
+                    state.trailing_stop_price = new_trailing
+                    logger.debug(f"追蹤停損下移: {state.trailing_stop_price}")
+
+            # 檢查固定停損
+            if current_price >= state.stop_loss_price:
+                logger.warning(
+                    f"固定停損觸發: 價格 {current_price} >= {state.stop_loss_price}"
+                )
+                return StopReason.FIXED_STOP_LOSS
+
+            # 檢查追蹤停損
+            if current_price >= state.trailing_stop_price:
+                logger.warning(
+                    f"追蹤停損觸發: 價格 {current_price} >= {state.trailing_stop_price}"
+                )
+                return StopReason.TRAILING_STOP
 
         return None
 
-    def _update_trailing_stop(self, current_price: float) -> None:
+    def check_stop_loss_series(
+        self, prices: Iterable[float]
+    ) -> tuple[int, Optional[StopReason]]:
         """
-        更新追蹤停損線
+        依序對一段價格檢查停損（回測用）
+
+        結果與逐筆呼叫 check_stop_loss 直到觸發為止相同，但整段在單一迴圈中
+        以區域變數計算，結束時才將最有利價格與追蹤停損線寫回狀態。
+        空單價格乘上 -1 後，與多單共用同一組比較式。
+
+        Args:
+            prices: 依時間排序的價格序列
 
-        只往有利方向移動：
-        - 多單：價格創新高時，停損線上移
-        - 空單：價格創新低時，停損線下移
+        Returns:
+            (觸發停損的索引, 停損原因)；整段皆未觸發時返回 (-1, None)
         """
-        direction = self.state.position_direction
-
-        if direction == "long" and current_price > self.state.best_price:
-            self.state.best_price = current_price
-            new_trailing = current_price - self.trailing_stop_points
-            if new_trailing > self.state.trailing_stop_price:
-                self.state.trailing_stop_price = new_trailing
-                logger.debug(f"追蹤停損上移: {self.state.trailing_stop_price}")
-
-        elif direction == "short" and current_price < self.state.best_price:
-            self.state.best_price = current_price
-            new_trailing = current_price + self.trailing_stop_points
-            if new_trailing < self.state.trailing_stop_price:
-                self.state.trailing_stop_price = new_trailing
-                logger.debug(f"追蹤停損下移: {self.state.trailing_stop_price}")
+        state = self.state
+        direction = state.position_direction
+        if direction == "long":
+            sign = 1
+        elif direction == "short":
+            sign = -1
+        else:
+            return -1, None
+
+        points = self.trailing_stop_points
+        best = sign * state.best_price
+        trailing = sign * state.trailing_stop_price
+        stop_loss = sign * state.stop_loss_price
+
+        index, reason = -1, None
+        for i, price in enumerate(prices):
+            signed = sign * price
+            if signed > best:
+                best = signed
+                if signed - points > trailing:
+                    trailing = signed - points
+            if signed <= stop_loss:
+                index, reason = i, StopReason.FIXED_STOP_LOSS
+                break
+            if signed <= trailing:
+                index, reason = i, StopReason.TRAILING_STOP
+                break
+
+        state.best_price = sign * best
+        state.trailing_stop_price = sign * trailing
+
+        if reason is not None:
+            logger.warning(f"{reason.value} 觸發: 第 {index} 筆價格")
+        return index, reason
 
     def can_trade(self) -> tuple[bool, str]:
         """
@@ -259,3 +316,69 @@ class RiskManager:
         """從持久化狀態恢復"""
         self.state = state
         logger.info(f"風控狀態已恢復: daily_pnl={state.daily_pnl}")
+
+
+@dataclass(frozen=True)
+class GridResult:
+    """simulate_stop_grid 單組參數的回放結果"""
+    stop_loss_points: int
+    trailing_stop_points: int
+    daily_pnl: float
+    trade_count: int
+    trading_halted: bool
+
+
+def simulate_stop_grid(
+    prices: Sequence[float],
+    entries: Sequence[tuple[int, str]],
+    param_grid: Iterable[tuple[int, int]],
+    daily_max_loss_points: int = 200,
+    daily_max_trades: int = 10,
+) -> list[GridResult]:
+    """
+    以多組停損參數回放同一天的價格與進場點（參數掃描用）
+
+    每組參數各自建立 RiskManager，依序處理進場點：進場後以
+    check_stop_loss_series 找出停損位置並平倉；持倉期間出現的進場點略過，
+    收盤前仍未停損則以最後一筆價格平倉。can_trade 不允許時停止進場。
+
+    Args:
+        prices: 當日依時間排序的價格
+        entries: (價格索引, 方向) 進場點，依索引排序
+        param_grid: (stop_loss_points, trailing_stop_points) 參數組合
+        daily_max_loss_points: 每日最大虧損點數
+        daily_max_trades: 每日最大交易次數
+
+    Returns:
+        與 param_grid 順序相同的回放結果
+    """
+    last_index = len(prices) - 1
+    results = []
+    for stop_loss_points, trailing_stop_points in param_grid:
+        rm = RiskManager(
+            stop_loss_points=stop_loss_points,
+            trailing_stop_points=trailing_stop_points,
+            daily_max_loss_points=daily_max_loss_points,
+            daily_max_trades=daily_max_trades,
+        )
+        next_allowed = 0
+        for index, direction in entries:
+            if index < next_allowed:
+                continue
+            if not rm.can_trade()[0]:
+                break
+
+            rm.on_entry(prices[index], direction)
+            offset, _ = rm.check_stop_loss_series(islice(prices, index + 1, None))
+            exit_index = index + 1 + offset if offset >= 0 else last_index
+            rm.on_exit(prices[exit_index])
+            next_allowed = exit_index + 1
+
+        results.append(GridResult(
+            stop_loss_points=stop_loss_points,
+            trailing_stop_points=trailing_stop_points,
+            daily_pnl=rm.state.daily_pnl,
+            trade_count=rm.state.daily_trade_count,
+            trading_halted=rm.state.trading_halted,
+        ))
+    return results
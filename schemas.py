@@ -0,0 +1,37 @@
+"""
+下單請求資料模型
+
+僅依賴 pydantic，不引入 FastAPI、SQLAlchemy 或 shioaji，
+讓驗證邏輯可以在不載入 main.py 的情況下單獨使用與測試。
+"""
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+ACCEPT_ACTIONS = Literal["long_entry", "long_exit", "short_entry", "short_exit"]
+ACCEPT_PRICE_TYPES = frozenset({"MKT", "LMT"})
+
+
+class OrderRequest(BaseModel):
+    action: ACCEPT_ACTIONS
+    quantity: int = Field(..., gt=0)
+    symbol: str
+    price_type: str = Field(default="MKT", description="Price type: MKT (market) or LMT (limit)")
+    price: Optional[float] = Field(default=None, description="Price for limit orders")
+
+    @model_validator(mode="after")
+    def validate_order_params(self):
+        # Symbol validation is now done via the trading worker
+        # We'll validate during order processing instead
+
+        # Validate price type
+        if self.price_type not in ACCEPT_PRICE_TYPES:
+            raise ValueError("price_type must be 'MKT' or 'LMT'")
+
+        # Validate price for limit orders
+        if self.price_type == "LMT":
+            if self.price is None or self.price <= 0:
+                raise ValueError("price must be provided and > 0 for limit orders")
+
+        return self
@@ -50,6 +50,8 @@ class StrategyEventStorage:
 
         self._running = False
         self._flush_thread: Optional[threading.Thread] = None
+        # stop 時立即喚醒背景執行緒，不必等待完整的 flush_interval
+        self._stop_event = threading.Event()
 
         # 統計資訊
         self._total_events_stored = 0
@@ -73,6 +75,7 @@ class StrategyEventStorage:
             return
 
         self._running = True
+        self._stop_event.clear()
         self._flush_thread = threading.Thread(
             target=self._flush_loop,
             name="StrategyEventStorageFlushThread",
@@ -86,6 +89,7 @@ class StrategyEventStorage:
             return
 
         self._running = False
+        self._stop_event.set()
 
         if self._flush_thread and self._flush_thread.is_alive():
             self._flush_thread.join(timeout=5.0)
@@ -137,9 +141,9 @@ class StrategyEventStorage:
         """背景刷新迴圈"""
         while self._running:
             try:
-                time.sleep(self._flush_interval)
-                if self._running:
-                    self._flush_buffer()
+                if self._stop_event.wait(self._flush_interval):
+                    break
+                self._flush_buffer()
             except Exception as e:
                 logger.error(f"背景刷新迴圈錯誤: {e}")
 
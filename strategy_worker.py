@@ -87,6 +87,21 @@ def is_trading_hours(now: Optional[datetime] = None) -> bool:
     return False
 
 
+def is_false_exit_success(result_data: dict) -> bool:
+    """
+    判斷平倉回應是否為假成功
+
+    券商無持倉可平時，交易服務仍回傳 success，但沒有 order_id 並附帶說明訊息。
+
+    Args:
+        result_data: 平倉回應資料
+
+    Returns:
+        是否為假成功
+    """
+    return result_data.get("order_id") is None and bool(result_data.get("message"))
+
+
 class StrategyWorker:
     """
     策略引擎主程式
@@ -437,7 +452,7 @@ class StrategyWorker:
             if response.success:
                 # 檢查假成功（券商無持倉可平）
                 result_data = response.data or {}
-                if result_data.get("order_id") is None and result_data.get("message"):
+                if is_false_exit_success(result_data):
                     logger.warning(
                         f"平倉假成功（券商無持倉）: {result_data.get('message')} - "
                         f"強制清除本地持倉狀態"
@@ -485,6 +500,10 @@ class StrategyWorker:
             result_data: 交易回應資料
             price: 成交價格
         """
+        # 每筆委託各自 commit，不像策略事件那樣緩衝批次寫入：受 daily_max_trades
+        # 限制每日最多數十筆，批次省下的交易成本可忽略；而委託紀錄是實單的稽核
+        # 依據，/orders/{order_id}/recheck 也依此查詢，不能因緩衝延遲或在程序
+        # 異常結束時遺失
         try:
             db = SessionLocal()
             try:
@@ -0,0 +1,35 @@
+"""
+pytest 共用設定
+
+在收集測試前先匯入較重的應用模組（shioaji、SQLAlchemy 模型與 mapper），
+讓各測試檔第一次匯入時只是 sys.modules 查詢，匯入成本不會算進單一測試。
+
+main（FastAPI app）刻意不在這裡預先載入：只有 API 測試需要它，
+由下方的 main_module / client fixture 在第一次使用時匯入，只跑邏輯測試時不會載入 FastAPI。
+"""
+import pytest
+
+import status_mapper  # noqa: F401
+import strategy_config  # noqa: F401
+import strategy_engine  # noqa: F401
+import strategy_event_storage  # noqa: F401
+import trading  # noqa: F401
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    """延遲匯入 main（FastAPI app），整個測試 session 只匯入一次
+
+    直接匯入真實模組，不以 sys.modules 替換 redis 等依賴：main 匯入時不會連線，
+    替換反而會讓之後真正需要 redis 的測試拿到假模組。
+    """
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(main_module):
+    """整個測試 session 共用的 TestClient（不進入 lifespan，避免啟動時連線 Redis）"""
+    from fastapi.testclient import TestClient
+
+    return TestClient(main_module.app)
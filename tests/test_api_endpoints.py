@@ -17,6 +17,8 @@ from fastapi.testclient import TestClient
 from config import settings
 from trading_queue import TradingResponse
 
+pytestmark = pytest.mark.api
+
 
 def get_test_client_with_db_override(mock_db):
     """建立帶有資料庫依賴覆蓋的測試客戶端"""
@@ -33,6 +35,15 @@ def get_test_client_with_db_override(mock_db):
     return TestClient(app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _auth_key():
+    """整個模組共用固定的認證金鑰，結束後還原"""
+    original = settings.auth_key
+    settings.auth_key = "test-key"
+    yield
+    settings.auth_key = original
+
+
 def cleanup_overrides():
     """清理依賴覆蓋"""
     from main import app
@@ -167,8 +178,7 @@ class TestVerifyAuthKey:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -192,8 +202,7 @@ class TestVerifyAuthKey:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "correct-key"):
-            response = client.get("/positions", headers={"X-Auth-Key": "wrong-key"})
+        response = client.get("/positions", headers={"X-Auth-Key": "wrong-key"})
 
         # Assert
         assert response.status_code == 401
@@ -557,8 +566,7 @@ class TestPositionsEndpoint:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -577,8 +585,7 @@ class TestPositionsEndpoint:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/positions", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 503
@@ -880,8 +887,7 @@ class TestOrdersEndpoint:
         client = get_test_client_with_db_override(mock_db)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/orders", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/orders", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -914,8 +920,7 @@ class TestTradesEndpoint:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/trades", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/trades", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -945,8 +950,7 @@ class TestMarginEndpoint:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/margin", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/margin", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -977,8 +981,7 @@ class TestUsageEndpoint:
         client = TestClient(app)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.get("/usage", headers={"X-Auth-Key": "test-key"})
+        response = client.get("/usage", headers={"X-Auth-Key": "test-key"})
 
         # Assert
         assert response.status_code == 200
@@ -1025,10 +1028,9 @@ class TestRecheckOrderEndpoint:
         client = get_test_client_with_db_override(mock_db)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.post(
-                "/orders/1/recheck", headers={"X-Auth-Key": "test-key"}
-            )
+        response = client.post(
+            "/orders/1/recheck", headers={"X-Auth-Key": "test-key"}
+        )
 
         # Assert
         assert response.status_code == 200
@@ -1044,10 +1046,9 @@ class TestRecheckOrderEndpoint:
         client = get_test_client_with_db_override(mock_db)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.post(
-                "/orders/999/recheck", headers={"X-Auth-Key": "test-key"}
-            )
+        response = client.post(
+            "/orders/999/recheck", headers={"X-Auth-Key": "test-key"}
+        )
 
         # Assert
         assert response.status_code == 404
@@ -1066,10 +1067,9 @@ class TestRecheckOrderEndpoint:
         client = get_test_client_with_db_override(mock_db)
 
         # Act
-        with patch.object(settings, "auth_key", "test-key"):
-            response = client.post(
-                "/orders/1/recheck", headers={"X-Auth-Key": "test-key"}
-            )
+        response = client.post(
+            "/orders/1/recheck", headers={"X-Auth-Key": "test-key"}
+        )
 
         # Assert
         assert response.status_code == 400
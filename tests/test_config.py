@@ -7,7 +7,6 @@ Config 單元測試
 3. 訂單狀態檢查設定
 """
 import pytest
-from unittest.mock import patch, patch as patch_dict
 
 
 class TestSettingsDefaults:
@@ -136,6 +135,15 @@ class TestSupportedProducts:
         assert isinstance(options, list)
         assert "TXO" in options
 
+    def test_supported_futures_list應該快取解析結果(self):
+        """測試: 重複存取 supported_futures_list 應返回同一個列表"""
+        from config import Settings
+
+        settings = Settings(supported_futures="MXF, TXF,")
+        first = settings.supported_futures_list
+        assert first == ["MXF", "TXF"]
+        assert settings.supported_futures_list is first
+
 
 class TestCredentialValidation:
     """認證驗證測試"""
@@ -156,20 +164,24 @@ class TestCredentialValidation:
         result = settings.validate_ca_credentials()
         assert isinstance(result, bool)
 
-    @patch.dict("os.environ", {"API_KEY": "", "SECRET_KEY": ""}, clear=False)
-    def test_validate_shioaji_credentials空字串應該返回False(self):
+    def test_validate_shioaji_credentials空字串應該返回False(self, monkeypatch):
         """測試: 空字串時 validate_shioaji_credentials 應該返回 False"""
         from config import Settings
 
+        monkeypatch.setenv("API_KEY", "")
+        monkeypatch.setenv("SECRET_KEY", "")
+
         # 使用空字串建立設定
         settings = Settings(api_key="", secret_key="")
         assert settings.validate_shioaji_credentials() is False
 
-    @patch.dict("os.environ", {"CA_PATH": "", "CA_PASSWORD": ""}, clear=False)
-    def test_validate_ca_credentials空字串應該返回False(self):
+    def test_validate_ca_credentials空字串應該返回False(self, monkeypatch):
         """測試: 空字串時 validate_ca_credentials 應該返回 False"""
         from config import Settings
 
+        monkeypatch.setenv("CA_PATH", "")
+        monkeypatch.setenv("CA_PASSWORD", "")
+
         # 使用空字串建立設定
         settings = Settings(ca_path="", ca_password="")
         assert settings.validate_ca_credentials() is False
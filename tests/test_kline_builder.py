@@ -11,10 +11,22 @@ KLineBuilder 單元測試
 """
 import pytest
 from datetime import datetime
-from unittest.mock import Mock
+from unittest.mock import patch
 
 from kline_builder import KLineBuilder, KLine
 
+pytestmark = pytest.mark.unit
+
+
+class _Capture:
+    """記錄 on_complete 回調收到的 K 線"""
+
+    def __init__(self):
+        self.calls: list[KLine] = []
+
+    def __call__(self, kline: KLine) -> None:
+        self.calls.append(kline)
+
 
 class TestKLine:
     """KLine 資料結構測試"""
@@ -92,7 +104,7 @@ class TestKLineBuilder:
 
     def test_新時間邊界應該觸發K線完成(self):
         """測試: 進入新時間邊界時，前一根 K 線應完成"""
-        callback = Mock()
+        callback = _Capture()
         builder = KLineBuilder(interval_minutes=3, on_complete=callback)
 
         # 第一根 K 線 09:00-09:03
@@ -103,8 +115,8 @@ class TestKLineBuilder:
         builder.on_tick(105.0, 8, datetime(2026, 1, 1, 9, 3, 0))
 
         # 回調應被觸發
-        callback.assert_called_once()
-        completed = callback.call_args[0][0]
+        assert len(callback.calls) == 1
+        completed = callback.calls[0]
         assert completed.open == 100.0
         assert completed.high == 110.0
         assert completed.close == 110.0
@@ -161,16 +173,31 @@ class TestKLineBuilder:
 
     def test_K線end_time應該正確計算(self):
         """測試: 完成的 K 線 end_time 應為 start_time + interval"""
-        callback = Mock()
+        callback = _Capture()
         builder = KLineBuilder(interval_minutes=3, on_complete=callback)
 
         builder.on_tick(100.0, 1, datetime(2026, 1, 1, 9, 0, 0))
         builder.on_tick(105.0, 1, datetime(2026, 1, 1, 9, 3, 0))
 
-        completed = callback.call_args[0][0]
+        completed = callback.calls[0]
         assert completed.start_time == datetime(2026, 1, 1, 9, 0, 0)
         assert completed.end_time == datetime(2026, 1, 1, 9, 3, 0)
 
+    def test_同一區間內的tick不應重新計算時間邊界(self):
+        """測試: tick 落在當前 K 線區間內時應沿用既有時間邊界"""
+        builder = KLineBuilder(interval_minutes=3)
+        builder.on_tick(100.0, 1, datetime(2026, 1, 1, 9, 0, 0))
+
+        with patch.object(builder, "_get_boundary", wraps=builder._get_boundary) as spy:
+            builder.on_tick(101.0, 1, datetime(2026, 1, 1, 9, 2, 59))
+            spy.assert_not_called()
+
+            builder.on_tick(102.0, 1, datetime(2026, 1, 1, 9, 3, 0))
+            spy.assert_called_once()
+
+        assert len(builder.history) == 1
+        assert builder.history[0].close == 101.0
+
     def test_get_history應該返回列表副本(self):
         """測試: get_history 應返回列表（非 deque 引用）"""
         builder = KLineBuilder(interval_minutes=3)
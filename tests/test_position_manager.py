@@ -10,9 +10,25 @@ PositionManager 單元測試
 """
 import pytest
 import time
+from dataclasses import FrozenInstanceError, replace
+from types import MappingProxyType
 from unittest.mock import patch
 
-from position_manager import PositionManager, PositionState
+from position_manager import PositionManager, PositionState, Side
+
+pytestmark = pytest.mark.unit
+
+# 券商持倉資料（唯讀，供同步測試共用）
+BROKER_LONG = (
+    MappingProxyType(
+        {"code": "MXF202601", "direction": "long", "quantity": 2, "price": 21000.0}
+    ),
+)
+BROKER_SHORT = (
+    MappingProxyType(
+        {"code": "MXF202601", "direction": "short", "quantity": 2, "price": 20900.0}
+    ),
+)
 
 
 class TestPositionState:
@@ -35,6 +51,22 @@ class TestPositionState:
         assert restored.quantity == 2
         assert restored.unrealized_pnl == 50.0
 
+    def test_未安裝orjson時應退回標準json(self):
+        """測試: orjson 不可用時仍應能序列化與反序列化"""
+        state = PositionState(direction="short", entry_price=20900.0, quantity=1)
+
+        with patch("position_manager.orjson", None):
+            restored = PositionState.from_json(state.to_json())
+
+        assert restored == state
+
+    def test_狀態應為不可變(self):
+        """測試: PositionState 不允許就地修改"""
+        state = PositionState()
+
+        with pytest.raises(FrozenInstanceError):
+            state.direction = "long"
+
 
 class TestPositionManagerOpenClose:
     """開倉/平倉測試"""
@@ -66,6 +98,18 @@ class TestPositionManagerOpenClose:
         assert pm.entry_price == 21000.0
         assert pm.state.quantity == 3
 
+    def test_side應對應持倉方向(self):
+        """測試: side 應回傳對應的 Side 數值"""
+        pm = PositionManager()
+        assert pm.side is Side.FLAT
+
+        pm.open_position("long", 21000.0)
+        assert pm.side is Side.LONG
+
+        pm.close_position(21000.0)
+        pm.open_position("short", 21000.0)
+        assert pm.side is Side.SHORT
+
     def test_多單平倉應正確計算損益(self):
         """測試: 多單平倉損益 = 出場價 - 進場價"""
         pm = PositionManager()
@@ -142,14 +186,14 @@ class TestPositionManagerSync:
     def test_同步間隔內不需要同步(self):
         """測試: 同步間隔內不應需要同步"""
         pm = PositionManager(sync_interval=60)
-        pm.state.last_sync_time = time.time()
+        pm.state = replace(pm.state, last_sync_time=time.time())
 
         assert pm.should_sync() is False
 
     def test_超過同步間隔應需要同步(self):
         """測試: 超過同步間隔應需要同步"""
         pm = PositionManager(sync_interval=60)
-        pm.state.last_sync_time = time.time() - 61
+        pm.state = replace(pm.state, last_sync_time=time.time() - 61)
 
         assert pm.should_sync() is True
 
@@ -174,10 +218,7 @@ class TestPositionManagerSync:
         pm = PositionManager(symbol="MXFR1")
         pm.open_position("long", 21000.0)
 
-        broker_positions = [
-            {"code": "MXF202601", "direction": "short", "quantity": 2, "price": 20900.0}
-        ]
-        corrected = pm.sync_with_broker(broker_positions)
+        corrected = pm.sync_with_broker(BROKER_SHORT)
 
         assert corrected is True
         assert pm.direction == "short"
@@ -188,10 +229,7 @@ class TestPositionManagerSync:
         pm = PositionManager(symbol="MXFR1")
         pm.open_position("long", 21000.0)
 
-        broker_positions = [
-            {"code": "MXF202601", "direction": "long", "quantity": 2, "price": 21000.0}
-        ]
-        corrected = pm.sync_with_broker(broker_positions)
+        corrected = pm.sync_with_broker(BROKER_LONG)
 
         assert corrected is False
 
@@ -4,7 +4,9 @@
 """
 import pytest
 from unittest.mock import Mock, patch
-from main import OrderRequest
+from schemas import OrderRequest
+
+pytestmark = pytest.mark.unit
 
 
 class TestPriceTypeFeature:
@@ -35,25 +37,26 @@ class TestPriceTypeFeature:
         assert order.price_type == "LMT"
         assert order.price == 23500.0
     
-    def test_order_request_limit_order_missing_price(self):
-        """測試限價單缺少價格時的驗證錯誤"""
-        with pytest.raises(ValueError, match="price must be provided"):
-            OrderRequest(
-                action="long_entry",
-                quantity=1,
-                symbol="TMFR1",
-                price_type="LMT"
-                # 缺少 price
-            )
-    
-    def test_order_request_invalid_price_type(self):
-        """測試無效價格類型的驗證錯誤"""
-        with pytest.raises(ValueError, match="price_type must be"):
+    @pytest.mark.parametrize(
+        "kwargs,match",
+        [
+            # 限價單缺少價格
+            (dict(price_type="LMT"), "price must be provided"),
+            # 無效價格類型
+            (dict(price_type="INVALID"), "price_type must be"),
+            # 限價單價格為0
+            (dict(price_type="LMT", price=0.0), "price must be provided and > 0"),
+        ],
+        ids=["limit_order_missing_price", "invalid_price_type", "limit_order_zero_price"],
+    )
+    def test_order_request_invalid(self, kwargs, match):
+        """測試無效參數時的驗證錯誤"""
+        with pytest.raises(ValueError, match=match):
             OrderRequest(
                 action="long_entry",
                 quantity=1,
                 symbol="TMFR1",
-                price_type="INVALID"
+                **kwargs
             )
     
     def test_order_request_default_price_type(self):
@@ -66,17 +69,6 @@ class TestPriceTypeFeature:
         )
         assert order.price_type == "MKT"
         assert order.price is None
-    
-    def test_order_request_limit_order_zero_price(self):
-        """測試限價單價格為0時的驗證錯誤"""
-        with pytest.raises(ValueError, match="price must be provided and > 0"):
-            OrderRequest(
-                action="long_entry",
-                quantity=1,
-                symbol="TMFR1",
-                price_type="LMT",
-                price=0.0
-            )
 
 
 if __name__ == "__main__":
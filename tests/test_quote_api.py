@@ -7,29 +7,83 @@
 3. GET /quotes/history/export - 匯出報價歷史 (CSV/JSON)
 4. GET /quotes/symbols - 取得有報價歷史的商品列表
 """
+import orjson
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import Mock, MagicMock, patch
-from fastapi.testclient import TestClient
 from decimal import Decimal
 
-
-def get_test_client_with_db_override(mock_db):
-    """建立帶有資料庫依賴覆蓋的測試客戶端"""
-    from main import app
-    from database import get_db
-
-    def override_get_db():
-        return mock_db
-
-    app.dependency_overrides[get_db] = override_get_db
-    return TestClient(app)
-
-
-def cleanup_overrides():
-    """清理依賴覆蓋"""
-    from main import app
-    app.dependency_overrides.clear()
+from database import get_db
+from main import app, QuoteHistoryResponse
+from models import QuoteHistory
+
+pytestmark = pytest.mark.api
+
+
+@pytest.fixture
+def mock_db(client):
+    """覆蓋 get_db 依賴為 MagicMock，測試結束後移除覆蓋"""
+    db = MagicMock()
+    app.dependency_overrides[get_db] = lambda: db
+    yield db
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def chain_query():
+    """建立可鏈式呼叫的查詢 Mock（filter/order_by/offset/limit 皆返回自身）"""
+
+    def make(result=None, count=None):
+        query = MagicMock()
+        query.filter.return_value = query
+        query.order_by.return_value = query
+        query.offset.return_value = query
+        query.limit.return_value = query
+        query.all.return_value = [] if result is None else result
+        query.count.return_value = count
+        return query
+
+    return make
+
+
+# 測試用固定時間（測試不驗證實際時鐘，避免每次呼叫 datetime.now）
+_FIXED_TS = datetime(2024, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+_FIXED_ISO = _FIXED_TS.isoformat()
+
+# create_mock_quote_history 共用的固定欄位（模組載入時建立一次）
+_MOCK_QUOTE_FIELDS = {
+    "open_price": Decimal("21400.0"),
+    "high_price": Decimal("21600.0"),
+    "low_price": Decimal("21350.0"),
+    "change_price": Decimal("100.0"),
+    "change_rate": Decimal("0.47"),
+    "volume": 150,
+    "total_volume": 52000,
+    "buy_price": Decimal("21499.0"),
+    "sell_price": Decimal("21501.0"),
+    "buy_volume": 50,
+    "sell_volume": 60,
+}
+_MOCK_QUOTE_DICT_TEMPLATE = {
+    "id": None,
+    "symbol": None,
+    "code": None,
+    "quote_type": None,
+    "close_price": None,
+    "open_price": 21400.0,
+    "high_price": 21600.0,
+    "low_price": 21350.0,
+    "change_price": 100.0,
+    "change_rate": 0.47,
+    "volume": 150,
+    "total_volume": 52000,
+    "buy_price": 21499.0,
+    "sell_price": 21501.0,
+    "buy_volume": 50,
+    "sell_volume": 60,
+    "quote_time": None,
+    "created_at": None,
+}
 
 
 def create_mock_quote_history(
@@ -41,47 +95,33 @@ def create_mock_quote_history(
     quote_time: datetime = None,
 ):
     """建立模擬的 QuoteHistory 物件"""
-    mock_quote = MagicMock()
-    mock_quote.id = id
-    mock_quote.symbol = symbol
-    mock_quote.code = code
-    mock_quote.quote_type = quote_type
-    mock_quote.close_price = Decimal(str(close_price)) if close_price else None
-    mock_quote.open_price = Decimal("21400.0")
-    mock_quote.high_price = Decimal("21600.0")
-    mock_quote.low_price = Decimal("21350.0")
-    mock_quote.change_price = Decimal("100.0")
-    mock_quote.change_rate = Decimal("0.47")
-    mock_quote.volume = 150
-    mock_quote.total_volume = 52000
-    mock_quote.buy_price = Decimal("21499.0")
-    mock_quote.sell_price = Decimal("21501.0")
-    mock_quote.buy_volume = 50
-    mock_quote.sell_volume = 60
-    mock_quote.quote_time = quote_time or datetime.now(timezone.utc)
-    mock_quote.created_at = datetime.now(timezone.utc)
-
-    # 設定 to_dict 方法
-    mock_quote.to_dict.return_value = {
-        "id": id,
-        "symbol": symbol,
-        "code": code,
-        "quote_type": quote_type,
-        "close_price": float(close_price) if close_price else None,
-        "open_price": 21400.0,
-        "high_price": 21600.0,
-        "low_price": 21350.0,
-        "change_price": 100.0,
-        "change_rate": 0.47,
-        "volume": 150,
-        "total_volume": 52000,
-        "buy_price": 21499.0,
-        "sell_price": 21501.0,
-        "buy_volume": 50,
-        "sell_volume": 60,
-        "quote_time": mock_quote.quote_time.isoformat(),
-        "created_at": mock_quote.created_at.isoformat(),
-    }
+    mock_quote = Mock(spec=QuoteHistory)
+    mock_quote.configure_mock(
+        id=id,
+        symbol=symbol,
+        code=code,
+        quote_type=quote_type,
+        close_price=Decimal(str(close_price)) if close_price else None,
+        quote_time=quote_time or _FIXED_TS,
+        created_at=_FIXED_TS,
+        **_MOCK_QUOTE_FIELDS,
+    )
+
+    # 設定 to_dict 方法（只有匯出等實際呼叫 to_dict 的測試才建立字典）
+    def build_dict():
+        quote_dict = _MOCK_QUOTE_DICT_TEMPLATE.copy()
+        quote_dict.update(
+            id=id,
+            symbol=symbol,
+            code=code,
+            quote_type=quote_type,
+            close_price=float(close_price) if close_price else None,
+            quote_time=quote_time.isoformat() if quote_time else _FIXED_ISO,
+            created_at=_FIXED_ISO,
+        )
+        return quote_dict
+
+    mock_quote.to_dict.side_effect = build_dict
 
     return mock_quote
 
@@ -89,309 +129,178 @@ def create_mock_quote_history(
 class TestGetQuoteHistory:
     """GET /quotes/history 測試"""
 
-    def test_查詢報價歷史應該返回列表(self):
+    def test_查詢報價歷史應該返回列表(self, client, mock_db, chain_query):
         """測試: 查詢報價歷史應該返回報價列表"""
         # Arrange
-        mock_db = MagicMock()
         mock_quotes = [
             create_mock_quote_history(id=1, close_price=21500.0),
             create_mock_quote_history(id=2, close_price=21501.0),
         ]
 
-        mock_query = MagicMock()
-        mock_query.order_by.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = mock_quotes
-        mock_db.query.return_value = mock_query
-
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history")
-
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 2
-            assert data[0]["id"] == 1
-            assert data[1]["id"] == 2
-        finally:
-            cleanup_overrides()
-
-    def test_依symbol篩選應該正確過濾(self):
-        """測試: 依 symbol 篩選應該正確過濾結果"""
-        # Arrange
-        mock_db = MagicMock()
-        mock_quotes = [
-            create_mock_quote_history(id=1, symbol="MXFR1"),
-        ]
-
-        mock_query = MagicMock()
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = mock_quotes
+        mock_query = chain_query(mock_quotes)
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history?symbol=MXFR1")
-
-            # Assert
-            assert response.status_code == 200
-            mock_query.filter.assert_called()
-        finally:
-            cleanup_overrides()
+        # Act
+        response = client.get("/quotes/history")
 
-    def test_依quote_type篩選應該正確過濾(self):
-        """測試: 依 quote_type 篩選應該正確過濾結果"""
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert len(data) == 2
+        assert data[0]["id"] == 1
+        assert data[1]["id"] == 2
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/quotes/history?symbol=MXFR1",
+            "/quotes/history?quote_type=tick",
+            "/quotes/history/export?symbol=MXFR1&quote_type=tick&format=json",
+        ],
+        ids=["依symbol篩選", "依quote_type篩選", "匯出帶篩選條件"],
+    )
+    def test_篩選條件應該套用到查詢(self, client, mock_db, chain_query, url):
+        """測試: 帶篩選參數時應該呼叫 query.filter"""
         # Arrange
-        mock_db = MagicMock()
-        mock_quotes = [
-            create_mock_quote_history(id=1, quote_type="tick"),
-        ]
-
-        mock_query = MagicMock()
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = mock_quotes
+        mock_query = chain_query([create_mock_quote_history(id=1)])
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history?quote_type=tick")
+        # Act
+        response = client.get(url)
 
-            # Assert
-            assert response.status_code == 200
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        mock_query.filter.assert_called()
 
-    def test_分頁參數應該正確套用(self):
+    def test_分頁參數應該正確套用(self, client, mock_db, chain_query):
         """測試: limit 和 offset 應該正確套用"""
         # Arrange
-        mock_db = MagicMock()
-
-        mock_query = MagicMock()
-        mock_query.order_by.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_query = chain_query()
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history?limit=50&offset=100")
+        # Act
+        response = client.get("/quotes/history?limit=50&offset=100")
 
-            # Assert
-            assert response.status_code == 200
-            mock_query.offset.assert_called_with(100)
-            mock_query.limit.assert_called_with(50)
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        mock_query.offset.assert_called_with(100)
+        mock_query.limit.assert_called_with(50)
 
 
 class TestGetQuoteHistoryCount:
     """GET /quotes/history/count 測試"""
 
-    def test_取得報價歷史筆數(self):
+    def test_取得報價歷史筆數(self, client, mock_db, chain_query):
         """測試: 應該返回報價歷史總筆數"""
         # Arrange
-        mock_db = MagicMock()
-
-        mock_query = MagicMock()
-        mock_query.count.return_value = 12345
+        mock_query = chain_query(count=12345)
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history/count")
+        # Act
+        response = client.get("/quotes/history/count")
 
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data["count"] == 12345
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert data["count"] == 12345
 
-    def test_帶篩選條件取得筆數(self):
+    def test_帶篩選條件取得筆數(self, client, mock_db, chain_query):
         """測試: 帶篩選條件時應該返回符合條件的筆數"""
         # Arrange
-        mock_db = MagicMock()
-
-        mock_query = MagicMock()
-        mock_query.filter.return_value = mock_query
-        mock_query.count.return_value = 500
+        mock_query = chain_query(count=500)
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history/count?symbol=MXFR1&quote_type=tick")
+        # Act
+        response = client.get("/quotes/history/count?symbol=MXFR1&quote_type=tick")
 
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data["count"] == 500
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert data["count"] == 500
 
 
 class TestExportQuoteHistory:
     """GET /quotes/history/export 測試"""
 
-    def test_匯出JSON格式(self):
+    def test_匯出JSON格式(self, client, mock_db, chain_query):
         """測試: format=json 應該返回 JSON 陣列"""
         # Arrange
-        mock_db = MagicMock()
         mock_quotes = [
             create_mock_quote_history(id=1),
             create_mock_quote_history(id=2),
         ]
 
-        mock_query = MagicMock()
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = mock_quotes
+        mock_query = chain_query(mock_quotes)
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history/export?format=json")
+        # Act
+        response = client.get("/quotes/history/export?format=json")
 
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 2
-            assert data[0]["id"] == 1
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert len(data) == 2
+        assert data[0]["id"] == 1
 
-    def test_匯出CSV格式(self):
+    def test_匯出CSV格式(self, client, mock_db, chain_query):
         """測試: format=csv 應該返回 CSV 檔案"""
         # Arrange
-        mock_db = MagicMock()
         mock_quotes = [
             create_mock_quote_history(id=1, symbol="MXFR1"),
         ]
 
-        mock_query = MagicMock()
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = mock_quotes
-        mock_db.query.return_value = mock_query
-
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/history/export?format=csv")
-
-            # Assert
-            assert response.status_code == 200
-            assert response.headers["content-type"] == "text/csv; charset=utf-8"
-            assert "attachment" in response.headers["content-disposition"]
-
-            # 驗證 CSV 內容
-            content = response.text
-            assert "id,symbol,code,quote_type" in content
-            assert "MXFR1" in content
-        finally:
-            cleanup_overrides()
-
-    def test_匯出帶篩選條件(self):
-        """測試: 匯出時應該套用篩選條件"""
-        # Arrange
-        mock_db = MagicMock()
-
-        mock_query = MagicMock()
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_query = chain_query(mock_quotes)
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
+        # Act
+        response = client.get("/quotes/history/export?format=csv")
 
-        try:
-            # Act
-            response = client.get(
-                "/quotes/history/export?symbol=MXFR1&quote_type=tick&format=json"
-            )
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert "attachment" in response.headers["content-disposition"]
 
-            # Assert
-            assert response.status_code == 200
-            mock_query.filter.assert_called()
-        finally:
-            cleanup_overrides()
+        # 驗證 CSV 內容
+        content = response.text
+        assert "id,symbol,code,quote_type" in content
+        assert "MXFR1" in content
 
 
 class TestGetQuoteSymbols:
     """GET /quotes/symbols 測試"""
 
-    def test_取得有報價歷史的商品列表(self):
+    def test_取得有報價歷史的商品列表(self, client, mock_db, chain_query):
         """測試: 應該返回有報價歷史的商品代碼列表"""
         # Arrange
-        mock_db = MagicMock()
-
         # 模擬 distinct 查詢結果
-        mock_query = MagicMock()
-        mock_query.all.return_value = [("MXFR1",), ("TXFR1",), ("TMFR1",)]
+        mock_query = chain_query([("MXFR1",), ("TXFR1",), ("TMFR1",)])
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/symbols")
-
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data["count"] == 3
-            assert "MXFR1" in data["symbols"]
-            assert "TXFR1" in data["symbols"]
-            assert "TMFR1" in data["symbols"]
-        finally:
-            cleanup_overrides()
+        # Act
+        response = client.get("/quotes/symbols")
 
-    def test_無報價歷史時返回空列表(self):
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert data["count"] == 3
+        assert "MXFR1" in data["symbols"]
+        assert "TXFR1" in data["symbols"]
+        assert "TMFR1" in data["symbols"]
+
+    def test_無報價歷史時返回空列表(self, client, mock_db, chain_query):
         """測試: 無報價歷史時應該返回空列表"""
         # Arrange
-        mock_db = MagicMock()
-
-        mock_query = MagicMock()
-        mock_query.all.return_value = []
+        mock_query = chain_query()
         mock_db.query.return_value = mock_query
 
-        client = get_test_client_with_db_override(mock_db)
-
-        try:
-            # Act
-            response = client.get("/quotes/symbols")
+        # Act
+        response = client.get("/quotes/symbols")
 
-            # Assert
-            assert response.status_code == 200
-            data = response.json()
-            assert data["count"] == 0
-            assert data["symbols"] == []
-        finally:
-            cleanup_overrides()
+        # Assert
+        assert response.status_code == 200
+        data = orjson.loads(response.content)
+        assert data["count"] == 0
+        assert data["symbols"] == []
 
 
 class TestQuoteHistoryResponseModel:
@@ -399,10 +308,8 @@ class TestQuoteHistoryResponseModel:
 
     def test_模型應該正確處理Decimal欄位(self):
         """測試: 模型應該正確處理 Decimal 類型的價格欄位"""
-        from main import QuoteHistoryResponse
-
         # Arrange
-        mock_quote = MagicMock()
+        mock_quote = Mock(spec=QuoteHistory)
         mock_quote.id = 1
         mock_quote.symbol = "MXFR1"
         mock_quote.code = "MXFA6"
@@ -419,8 +326,8 @@ class TestQuoteHistoryResponseModel:
         mock_quote.sell_price = Decimal("21501.00")
         mock_quote.buy_volume = 50
         mock_quote.sell_volume = 60
-        mock_quote.quote_time = datetime.now(timezone.utc)
-        mock_quote.created_at = datetime.now(timezone.utc)
+        mock_quote.quote_time = _FIXED_TS
+        mock_quote.created_at = _FIXED_TS
 
         # Act
         response = QuoteHistoryResponse.model_validate(mock_quote)
@@ -431,10 +338,8 @@ class TestQuoteHistoryResponseModel:
 
     def test_模型應該允許None欄位(self):
         """測試: 模型應該允許可選欄位為 None"""
-        from main import QuoteHistoryResponse
-
         # Arrange
-        mock_quote = MagicMock()
+        mock_quote = Mock(spec=QuoteHistory)
         mock_quote.id = 1
         mock_quote.symbol = "MXFR1"
         mock_quote.code = "MXFA6"
@@ -451,7 +356,7 @@ class TestQuoteHistoryResponseModel:
         mock_quote.sell_price = Decimal("21501.00")
         mock_quote.buy_volume = 50
         mock_quote.sell_volume = 60
-        mock_quote.quote_time = datetime.now(timezone.utc)
+        mock_quote.quote_time = _FIXED_TS
         mock_quote.created_at = None
 
         # Act
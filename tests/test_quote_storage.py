@@ -9,13 +9,39 @@ QuoteStorage 單元測試
 5. 錯誤處理與重試
 6. 統計資訊
 """
+import gc
 import pytest
 import time
 import threading
 from unittest.mock import Mock, MagicMock, patch, call
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
-from quote_storage import QuoteStorage, MAX_WRITE_RETRIES
+from sqlalchemy.dialects import postgresql
+
+from quote_storage import QuoteStorage, MAX_WRITE_RETRIES, _QUOTE_INSERT
+
+# 測試記錄共用的固定報價時間（2024-01-01 00:00:00 UTC = 1704067200000 ms）
+_QUOTE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _bind_connection(mock_engine: MagicMock) -> MagicMock:
+    """設定 engine.begin() 內容管理器並返回其中的 Connection Mock"""
+    context = mock_engine.begin.return_value
+    context.__exit__.return_value = False  # 不吞掉區塊內的例外
+    return context.__enter__.return_value
+
+
+def _push_records(storage: QuoteStorage, *close_prices: float) -> None:
+    """直接將報價記錄寫入 storage 的緩衝區"""
+    for close_price in close_prices:
+        storage._buffer.put_nowait(storage._create_quote_record({
+            "symbol": "MXFR1",
+            "code": "MXFA6",
+            "quote_type": "tick",
+            "close": close_price,
+            "timestamp": 1704067200000,
+        }))
 
 
 class TestQuoteStorageInit:
@@ -101,7 +127,7 @@ class TestQuoteStorageAddQuote:
 
     @patch("quote_storage.settings")
     def test_add_quote_缺少必要欄位應該返回False(self, mock_settings):
-        """測試: 缺少 symbol 或 code 時應該返回 False"""
+        """測試: 缺少 symbol 或 code（或為空字串）時應該返回 False"""
         # Arrange
         mock_settings.quote_storage_enabled = True
         mock_settings.quote_storage_buffer_size = 100
@@ -114,10 +140,14 @@ class TestQuoteStorageAddQuote:
         result1 = storage.add_quote({"code": "MXFA6"})
         # Act - 缺少 code
         result2 = storage.add_quote({"symbol": "MXFR1"})
+        # Act - 欄位存在但為空字串
+        result3 = storage.add_quote({"symbol": "", "code": "MXFA6"})
 
         # Assert
         assert result1 is False
         assert result2 is False
+        assert result3 is False
+        assert storage._buffer.empty()
 
     @patch("quote_storage.settings")
     def test_add_quote_應該加入緩衝區(self, mock_settings):
@@ -143,7 +173,7 @@ class TestQuoteStorageAddQuote:
 
         # Assert
         assert result is True
-        assert len(storage._buffer) == 1
+        assert storage._buffer.qsize() == 1
 
         # 清理
         storage.stop()
@@ -178,7 +208,8 @@ class TestQuoteStorageCreateQuoteRecord:
         assert record["code"] == "MXFA6"
         assert record["quote_type"] == "tick"
         assert record["close_price"] == 21500.0
-        assert isinstance(record["quote_time"], datetime)
+        assert record["quote_time"] == _QUOTE_TIME
+        assert record["quote_time"].tzinfo is timezone.utc
 
     @patch("quote_storage.settings")
     def test_create_quote_record_應該處理零值欄位(self, mock_settings):
@@ -208,14 +239,36 @@ class TestQuoteStorageCreateQuoteRecord:
         assert record["buy_price"] == 21499.0
         assert record["sell_price"] == 21501.0
 
+    @patch("quote_storage.settings")
+    def test_create_quote_record_不應該被GC追蹤(self, mock_settings):
+        """測試: 記錄只含不可變的原子值，不會增加循環 GC 的追蹤負擔"""
+        # Arrange
+        mock_settings.quote_storage_enabled = False
+        mock_settings.quote_storage_buffer_size = 100
+        mock_settings.quote_storage_flush_interval = 5.0
+
+        storage = QuoteStorage()
+
+        # Act
+        record = storage._create_quote_record({
+            "symbol": "MXFR1",
+            "code": "MXFA6",
+            "close": 21500.0,
+            "volume": 1,
+            "timestamp": 1704067200000,
+        })
+
+        # Assert
+        assert gc.is_tracked(record) is False
+
 
 class TestQuoteStorageFlushBuffer:
     """QuoteStorage._flush_buffer 測試"""
 
-    @patch("quote_storage.SessionLocal")
+    @patch("quote_storage.engine")
     @patch("quote_storage.settings")
     def test_flush_buffer_空緩衝區不應該建立資料庫連線(
-        self, mock_settings, mock_session_local
+        self, mock_settings, mock_engine
     ):
         """測試: 緩衝區為空時不應該建立資料庫連線"""
         # Arrange
@@ -229,13 +282,12 @@ class TestQuoteStorageFlushBuffer:
         storage._flush_buffer()
 
         # Assert
-        mock_session_local.assert_not_called()
+        mock_engine.begin.assert_not_called()
 
-    @patch("quote_storage.SessionLocal")
-    @patch("quote_storage.QuoteHistory")
+    @patch("quote_storage.engine")
     @patch("quote_storage.settings")
     def test_flush_buffer_應該批次儲存記錄(
-        self, mock_settings, mock_quote_history, mock_session_local
+        self, mock_settings, mock_engine
     ):
         """測試: _flush_buffer 應該批次儲存緩衝區記錄"""
         # Arrange
@@ -243,42 +295,85 @@ class TestQuoteStorageFlushBuffer:
         mock_settings.quote_storage_buffer_size = 100
         mock_settings.quote_storage_flush_interval = 5.0
 
-        mock_db = MagicMock()
-        mock_session_local.return_value = mock_db
+        mock_conn = _bind_connection(mock_engine)
 
         storage = QuoteStorage()
 
         # 手動加入記錄到緩衝區
-        storage._buffer.append({
-            "symbol": "MXFR1",
-            "code": "MXFA6",
-            "quote_type": "tick",
-            "close_price": 21500.0,
-            "quote_time": datetime.now(timezone.utc),
-        })
-        storage._buffer.append({
-            "symbol": "MXFR1",
-            "code": "MXFA6",
-            "quote_type": "tick",
-            "close_price": 21501.0,
-            "quote_time": datetime.now(timezone.utc),
-        })
+        _push_records(storage, 21500.0, 21501.0)
 
         # Act
         storage._flush_buffer()
 
         # Assert
-        mock_db.bulk_save_objects.assert_called_once()
-        mock_db.commit.assert_called_once()
-        mock_db.close.assert_called_once()
-        assert len(storage._buffer) == 0
+        mock_conn.execute.assert_called_once()
+        stmt, rows = mock_conn.execute.call_args[0]
+        assert stmt.table.name == "quote_history"
+        assert [row["close_price"] for row in rows] == [21500.0, 21501.0]
+        mock_engine.begin.assert_called_once()  # 單一交易，離開區塊時 commit
+        assert storage._buffer.empty()
         assert storage._total_quotes_stored == 2
         assert storage._total_flush_count == 1
 
-    @patch("quote_storage.SessionLocal")
+    @patch("quote_storage.settings")
+    def test_批次INSERT不應該要求RETURNING(self, mock_settings):
+        """測試: 批次 INSERT 不取回主鍵或預設值，避免逐筆 RETURNING"""
+        # Arrange
+        mock_settings.quote_storage_enabled = False
+        mock_settings.quote_storage_buffer_size = 100
+        mock_settings.quote_storage_flush_interval = 5.0
+
+        record = QuoteStorage()._create_quote_record({
+            "symbol": "MXFR1", "code": "MXFA6", "close": 21500.0, "timestamp": 1704067200000,
+        })
+
+        # Act
+        sql = str(_QUOTE_INSERT.compile(
+            dialect=postgresql.psycopg2.dialect(),
+            column_keys=list(record),
+            for_executemany=True,
+        ))
+
+        # Assert
+        assert "RETURNING" not in sql
+        assert "(id," not in sql
+
+    @patch("quote_storage.engine")
+    @patch("quote_storage.settings")
+    def test_flush_buffer_psycopg2應該使用COPY寫入(
+        self, mock_settings, mock_engine
+    ):
+        """測試: PostgreSQL (psycopg2) 時以 COPY FROM STDIN 寫入，None 輸出為空欄位"""
+        # Arrange
+        mock_settings.quote_storage_enabled = False
+        mock_settings.quote_storage_buffer_size = 100
+        mock_settings.quote_storage_flush_interval = 5.0
+
+        mock_conn = _bind_connection(mock_engine)
+        mock_conn.dialect.driver = "psycopg2"
+        cursor = mock_conn.connection.cursor.return_value
+        copied = {}
+        cursor.copy_expert.side_effect = lambda sql, buf: copied.update(sql=sql, data=buf.read())
+
+        storage = QuoteStorage()
+        _push_records(storage, 21500.0, 21501.0)
+
+        # Act
+        storage._flush_buffer()
+
+        # Assert
+        mock_conn.execute.assert_not_called()
+        assert copied["sql"].startswith("COPY quote_history (symbol, code, quote_type, close_price,")
+        lines = copied["data"].splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith("MXFR1,MXFA6,tick,21500.0,,")
+        cursor.close.assert_called_once()
+        assert storage._total_quotes_stored == 2
+
+    @patch("quote_storage.engine")
     @patch("quote_storage.settings")
     def test_flush_buffer_資料庫錯誤應該重試(
-        self, mock_settings, mock_session_local
+        self, mock_settings, mock_engine
     ):
         """測試: 資料庫錯誤時應該重試"""
         # Arrange
@@ -288,24 +383,17 @@ class TestQuoteStorageFlushBuffer:
 
         from sqlalchemy.exc import SQLAlchemyError
 
-        mock_db = MagicMock()
-        mock_db.bulk_save_objects.side_effect = SQLAlchemyError("Connection error")
-        mock_session_local.return_value = mock_db
+        mock_conn = _bind_connection(mock_engine)
+        mock_conn.execute.side_effect = SQLAlchemyError("Connection error")
 
         storage = QuoteStorage()
-        storage._buffer.append({
-            "symbol": "MXFR1",
-            "code": "MXFA6",
-            "quote_type": "tick",
-            "close_price": 21500.0,
-            "quote_time": datetime.now(timezone.utc),
-        })
+        _push_records(storage, 21500.0)
 
         # Act
         storage._flush_buffer()
 
         # Assert - 應該重試 MAX_WRITE_RETRIES 次
-        assert mock_db.bulk_save_objects.call_count == MAX_WRITE_RETRIES
+        assert mock_conn.execute.call_count == MAX_WRITE_RETRIES
         assert storage._consecutive_errors > 0
 
 
@@ -350,32 +438,25 @@ class TestQuoteStorageStartStop:
         # Assert
         assert storage._running is False
 
-    @patch("quote_storage.SessionLocal")
+    @patch("quote_storage.engine")
     @patch("quote_storage.settings")
-    def test_stop_應該刷新剩餘資料(self, mock_settings, mock_session_local):
+    def test_stop_應該刷新剩餘資料(self, mock_settings, mock_engine):
         """測試: stop 應該在停止前刷新緩衝區剩餘資料"""
         # Arrange
         mock_settings.quote_storage_enabled = True  # 啟用才會呼叫 stop 時刷新
         mock_settings.quote_storage_buffer_size = 100
         mock_settings.quote_storage_flush_interval = 100.0  # 長間隔避免自動刷新
 
-        mock_db = MagicMock()
-        mock_session_local.return_value = mock_db
+        mock_conn = _bind_connection(mock_engine)
 
         storage = QuoteStorage(enabled=True)
-        storage._buffer.append({
-            "symbol": "MXFR1",
-            "code": "MXFA6",
-            "quote_type": "tick",
-            "close_price": 21500.0,
-            "quote_time": datetime.now(timezone.utc),
-        })
+        _push_records(storage, 21500.0)
 
         # Act
         storage.stop()
 
         # Assert - 應該刷新剩餘資料
-        mock_db.bulk_save_objects.assert_called_once()
+        mock_conn.execute.assert_called_once()
 
 
 class TestQuoteStorageStats:
@@ -481,6 +562,102 @@ class TestQuoteStorageBufferTrigger:
         storage._running = False
         storage.stop()
 
+    @patch("quote_storage.settings")
+    def test_age_based_flush(self, mock_settings):
+        """測試: 刷新時機以批次第一筆報價的等待時間計算，而非啟動後的固定週期"""
+        # Arrange - 以可控的 monotonic 時鐘取代實際時間，刷新時機只依時鐘數值判斷
+        mock_settings.quote_storage_enabled = True
+        mock_settings.quote_storage_buffer_size = 100
+        mock_settings.quote_storage_flush_interval = 60.0
+
+        clock = [1000.0]
+        fake_time = SimpleNamespace(
+            monotonic=lambda: clock[0], time=time.time, sleep=time.sleep
+        )
+        flushed_at = []
+        flushed = threading.Event()
+
+        def wait_until_handled():
+            """等待背景執行緒處理完喚醒（清除 _wakeup）"""
+            deadline = time.monotonic() + 5.0
+            while storage._wakeup.is_set() and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert not storage._wakeup.is_set()
+
+        with patch("quote_storage.time", fake_time):
+            storage = QuoteStorage(enabled=True)
+
+            def fake_flush():
+                # 與實際 _flush_buffer 相同：重置批次起始時間並取出緩衝區
+                storage._batch_start_ts = None
+                drained = 0
+                while not storage._buffer.empty():
+                    storage._buffer.get_nowait()
+                    drained += 1
+                flushed_at.append(clock[0])
+                flushed.set()
+                return drained
+
+            with patch.object(storage, "_flush_buffer", side_effect=fake_flush):
+                # Act - 啟動 30 秒後才有第一筆報價
+                clock[0] = 1030.0
+                storage.add_quote({
+                    "symbol": "MXFR1", "code": "MXFA6", "quote_type": "tick",
+                    "close": 21500.0, "timestamp": 1704067200000
+                })
+                wait_until_handled()
+
+                # 啟動後已過 80 秒（固定週期會刷新），但第一筆報價只等待 50 秒
+                clock[0] = 1080.0
+                storage._wakeup.set()
+                wait_until_handled()
+                assert flushed_at == []
+
+                # 第一筆報價等待滿 flush_interval
+                clock[0] = 1090.0
+                storage._wakeup.set()
+                assert flushed.wait(timeout=5.0)
+
+                # Assert - 只在批次等待時間到達時刷新一次
+                assert flushed_at == [1090.0]
+                assert storage._buffer.empty()
+
+                storage._running = False
+                storage._wakeup.set()
+                storage._flush_thread.join(timeout=1.0)
+
+    def test_無觀測值時應該使用設定的刷新間隔(self):
+        """測試: 尚未觀測到刷新耗時或到達率時，等待時間為 flush_interval"""
+        storage = QuoteStorage(buffer_size=100, flush_interval=5.0, enabled=False)
+
+        assert storage._next_flush_wait() == 5.0
+
+        # 只有空刷新（未寫入資料庫）不應更新刷新耗時
+        storage._update_flush_metrics(written=0, flush_elapsed=0.5, arrived=0, period=1.0)
+        assert storage._flush_cost is None
+        assert storage._next_flush_wait() == 5.0
+
+    def test_刷新次數應該隨到達率次線性成長(self):
+        """測試: 到達率提高 10 倍時，定時刷新頻率增加應少於 10 倍"""
+        storage = QuoteStorage(buffer_size=100, flush_interval=5.0, enabled=False)
+        storage._flush_cost = 0.01
+
+        storage._arrival_rate = 10.0
+        slow_wait = storage._next_flush_wait()
+        storage._arrival_rate = 100.0
+        fast_wait = storage._next_flush_wait()
+
+        assert 0.01 <= fast_wait < slow_wait <= 5.0
+        assert (1 / fast_wait) / (1 / slow_wait) < 10
+
+    def test_到達率過高時應該只靠緩衝區大小觸發刷新(self):
+        """測試: λ > 2/F0 時不提前定時刷新"""
+        storage = QuoteStorage(buffer_size=100, flush_interval=5.0, enabled=False)
+        storage._flush_cost = 0.01
+        storage._arrival_rate = 500.0
+
+        assert storage._next_flush_wait() == 5.0
+
 
 class TestQuoteManagerWithQuoteStorage:
     """QuoteManager 與 QuoteStorage 整合測試"""
@@ -9,9 +9,12 @@ RiskManager 單元測試
 5. 狀態序列化/反序列化
 6. 每日重設
 """
+import random
+from unittest.mock import patch
+
 import pytest
 
-from risk_manager import RiskManager, RiskState, StopReason
+from risk_manager import RiskManager, RiskState, StopReason, simulate_stop_grid
 
 
 class TestRiskState:
@@ -40,6 +43,15 @@ class TestRiskState:
         assert restored.daily_pnl == -30.0
         assert restored.daily_trade_count == 3
 
+    def test_未安裝orjson時應退回標準json(self):
+        """測試: orjson 不可用時仍應能序列化與反序列化"""
+        state = RiskState(entry_price=21000.0, position_direction="short", halt_reason="test")
+
+        with patch("risk_manager.orjson", None):
+            restored = RiskState.from_json(state.to_json())
+
+        assert restored == state
+
 
 class TestRiskManagerFixedStopLoss:
     """固定停損測試"""
@@ -156,6 +168,100 @@ class TestRiskManagerTrailingStop:
         reason = rm.check_stop_loss(20930.0)
         assert reason == StopReason.TRAILING_STOP
 
+    def test_空單在鏡像價格路徑上應與多單同時觸發(self):
+        """測試: 空單走勢為多單以進場價鏡像時，應在同一個 tick 以相同原因出場"""
+        path = [21010.0, 21060.0, 21045.0, 21120.0, 21100.0, 21089.0, 21080.0]
+
+        results = {}
+        for direction, prices in (
+            ("long", path),
+            ("short", [2 * 21000.0 - p for p in path]),
+        ):
+            rm = RiskManager(stop_loss_points=50, trailing_stop_points=30)
+            rm.on_entry(21000.0, direction)
+            results[direction] = [rm.check_stop_loss(p) for p in prices]
+
+        assert results["long"] == results["short"]
+        assert results["long"][-1] == StopReason.TRAILING_STOP
+
+
+class TestRiskManagerStopLossSeries:
+    """check_stop_loss_series 批次檢查測試"""
+
+    @pytest.mark.parametrize("direction", ["long", "short"])
+    @pytest.mark.parametrize("seed", range(5))
+    def test_批次檢查應與逐筆檢查結果一致(self, direction, seed):
+        """測試: 隨機漫步價格下，批次與逐筆檢查的觸發位置、原因與狀態一致"""
+        rng = random.Random(seed)
+        prices, price = [], 21000.0
+        for _ in range(500):
+            price += rng.choice((-3.0, -2.0, -1.0, 0.0, 1.0, 2.0, 3.0))
+            prices.append(price)
+
+        scalar = RiskManager(stop_loss_points=50, trailing_stop_points=30)
+        scalar.on_entry(21000.0, direction)
+        expected = (-1, None)
+        for i, p in enumerate(prices):
+            reason = scalar.check_stop_loss(p)
+            if reason is not None:
+                expected = (i, reason)
+                break
+
+        series = RiskManager(stop_loss_points=50, trailing_stop_points=30)
+        series.on_entry(21000.0, direction)
+
+        assert series.check_stop_loss_series(prices) == expected
+        assert series.state == scalar.state
+
+    def test_空倉時應返回未觸發(self):
+        """測試: 無持倉時批次檢查應返回 (-1, None)"""
+        rm = RiskManager()
+        assert rm.check_stop_loss_series([21000.0, 20000.0]) == (-1, None)
+
+
+class TestSimulateStopGrid:
+    """simulate_stop_grid 參數掃描測試"""
+
+    @staticmethod
+    def _replay(prices, entries, stop_loss_points, trailing_stop_points):
+        """逐 tick 呼叫 check_stop_loss 的參考實作"""
+        rm = RiskManager(
+            stop_loss_points=stop_loss_points,
+            trailing_stop_points=trailing_stop_points,
+        )
+        entry_at = dict(entries)
+        for i, price in enumerate(prices):
+            if rm.state.position_direction != "flat":
+                if rm.check_stop_loss(price) is not None or i == len(prices) - 1:
+                    rm.on_exit(price)
+            elif i in entry_at and rm.can_trade()[0]:
+                rm.on_entry(price, entry_at[i])
+                if i == len(prices) - 1:
+                    rm.on_exit(price)
+        return rm.state
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_各組參數結果應與逐tick回放一致(self, seed):
+        """測試: 每組參數的每日損益、交易次數與停止狀態應與逐 tick 回放相同"""
+        rng = random.Random(seed)
+        prices, price = [], 21000.0
+        for _ in range(2000):
+            price += rng.choice((-4.0, -2.0, -1.0, 0.0, 1.0, 2.0, 4.0))
+            prices.append(price)
+        entries = [(i, rng.choice(("long", "short"))) for i in range(0, 2000, 97)]
+        grid = [(sl, tr) for sl in (20, 50) for tr in (10, 30)]
+
+        results = simulate_stop_grid(prices, entries, grid)
+
+        assert [(r.stop_loss_points, r.trailing_stop_points) for r in results] == grid
+        for result in results:
+            state = self._replay(
+                prices, entries, result.stop_loss_points, result.trailing_stop_points
+            )
+            assert result.daily_pnl == state.daily_pnl
+            assert result.trade_count == state.daily_trade_count
+            assert result.trading_halted == state.trading_halted
+
 
 class TestRiskManagerDailyLimits:
     """每日限制測試"""
@@ -9,20 +9,45 @@
 
 import pytest
 from datetime import datetime, timezone
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from models import Base, OrderHistory
 
 
-@pytest.fixture
-def db_session():
-    """建立測試用資料庫 session"""
-    engine = create_engine("sqlite:///:memory:")
+@pytest.fixture(scope="module")
+def engine():
+    """模組共用的記憶體資料庫（StaticPool 共用同一條連線，資料表只建立一次）"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqlite 預設會自行管理交易，需改由 SQLAlchemy 送出 BEGIN 才能正確使用 SAVEPOINT
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transaction(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine):
+    """建立測試用資料庫 session（測試內的 commit 只釋放 SAVEPOINT，結束時整筆回滾）"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
     yield session
     session.close()
+    transaction.rollback()
+    connection.close()
 
 
 class TestOrderHistorySimulationField:
@@ -197,6 +222,17 @@ class TestSimulationModeIndexes:
         ).first()
         assert result is not None
 
+    def test_mode_symbol_query_uses_composite_index(self, db_session):
+        """測試依模式 + 商品篩選並依時間排序時使用複合索引"""
+        plan = db_session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM order_history "
+            "WHERE simulation = 1 AND symbol = 'TXF' ORDER BY created_at DESC"
+        )).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_order_history_simulation_symbol_created" in details
+        assert "TEMP B-TREE" not in details  # 排序由索引提供
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
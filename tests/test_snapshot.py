@@ -1,10 +1,15 @@
 """
 Tests for snapshot (即時報價) functionality.
 
+API 端點測試位於 test_snapshot_api.py，本檔不需要載入 FastAPI。
+
 TDD: 先寫測試，再實作功能
 """
-import pytest
-from unittest.mock import Mock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock
+
+from trading import get_snapshot
+from trading_queue import TradingQueueClient, TradingOperation
 
 
 class TestGetSnapshot:
@@ -14,27 +19,27 @@ class TestGetSnapshot:
         """Snapshot 應該回傳即時價格資料"""
         # Arrange
         mock_api = Mock()
-        mock_contract = Mock()
-        mock_contract.symbol = "MXF202501"
+        mock_contract = SimpleNamespace(symbol="MXF202501")
         
-        # Mock snapshot response
-        mock_snapshot = Mock()
-        mock_snapshot.close = 23500.0
-        mock_snapshot.open = 23400.0
-        mock_snapshot.high = 23600.0
-        mock_snapshot.low = 23300.0
-        mock_snapshot.volume = 12345
-        mock_snapshot.total_volume = 98765
-        mock_snapshot.buy_price = 23499.0
-        mock_snapshot.sell_price = 23501.0
-        mock_snapshot.change_price = 100.0
-        mock_snapshot.change_rate = 0.43
-        mock_snapshot.ts = 1705395600000000000  # nanoseconds
+        # Mock snapshot response（get_snapshot 只讀取屬性，使用 SimpleNamespace 即可；
+        # mock_api 需要 snapshots.return_value，仍使用 Mock）
+        mock_snapshot = SimpleNamespace(
+            close=23500.0,
+            open=23400.0,
+            high=23600.0,
+            low=23300.0,
+            volume=12345,
+            total_volume=98765,
+            buy_price=23499.0,
+            sell_price=23501.0,
+            change_price=100.0,
+            change_rate=0.43,
+            ts=1705395600000000000,  # nanoseconds
+        )
         
         mock_api.snapshots.return_value = [mock_snapshot]
         
         # Act
-        from trading import get_snapshot
         result = get_snapshot(mock_api, mock_contract)
         
         # Assert
@@ -52,10 +57,9 @@ class TestGetSnapshot:
     def test_get_snapshot_handles_empty_response(self):
         """Snapshot 回傳空值時應該回傳 None"""
         mock_api = Mock()
-        mock_contract = Mock()
+        mock_contract = SimpleNamespace(symbol="MXF202501")
         mock_api.snapshots.return_value = []
         
-        from trading import get_snapshot
         result = get_snapshot(mock_api, mock_contract)
         
         assert result is None
@@ -63,63 +67,19 @@ class TestGetSnapshot:
     def test_get_snapshot_handles_exception(self):
         """Snapshot 發生錯誤時應該回傳 None 並記錄錯誤"""
         mock_api = Mock()
-        mock_contract = Mock()
+        mock_contract = SimpleNamespace(symbol="MXF202501")
         mock_api.snapshots.side_effect = Exception("API Error")
         
-        from trading import get_snapshot
         result = get_snapshot(mock_api, mock_contract)
         
         assert result is None
 
 
-class TestSnapshotAPI:
-    """Test snapshot API endpoint"""
-    
-    @pytest.fixture
-    def mock_queue_client(self):
-        with patch('main.get_queue_client') as mock:
-            yield mock
-    
-    def test_snapshot_endpoint_returns_price(self, mock_queue_client):
-        """GET /symbols/{symbol}/snapshot 應該回傳即時價格"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        # Mock response
-        mock_response = Mock()
-        mock_response.success = True
-        mock_response.data = {
-            "symbol": "MXF202501",
-            "close": 23500.0,
-            "open": 23400.0,
-            "high": 23600.0,
-            "low": 23300.0,
-            "buy_price": 23499.0,
-            "sell_price": 23501.0,
-            "change_price": 100.0,
-            "change_rate": 0.43,
-            "volume": 12345,
-            "ts": 1705395600000,
-        }
-        mock_queue_client.return_value.get_snapshot.return_value = mock_response
-        
-        client = TestClient(app)
-        response = client.get("/symbols/MXF202501/snapshot?simulation=true")
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["close"] == 23500.0
-        assert data["buy_price"] == 23499.0
-        assert data["sell_price"] == 23501.0
-
-
 class TestTradingQueueSnapshot:
     """Test TradingQueueClient.get_snapshot method"""
     
     def test_queue_client_has_get_snapshot_method(self):
         """TradingQueueClient 應該有 get_snapshot 方法"""
-        from trading_queue import TradingQueueClient, TradingOperation
-        
         # Verify operation exists
         assert hasattr(TradingOperation, 'GET_SNAPSHOT')
         
@@ -0,0 +1,46 @@
+"""
+Tests for snapshot API endpoint.
+
+需要 FastAPI TestClient，標記為 api（可用 -m "not api" 排除）。
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+pytestmark = pytest.mark.api
+
+
+class TestSnapshotAPI:
+    """Test snapshot API endpoint"""
+    
+    @pytest.fixture
+    def mock_queue_client(self):
+        with patch('main.get_queue_client') as mock:
+            yield mock
+    
+    def test_snapshot_endpoint_returns_price(self, mock_queue_client, client):
+        """GET /symbols/{symbol}/snapshot 應該回傳即時價格"""
+        # Mock response
+        mock_response = Mock()
+        mock_response.success = True
+        mock_response.data = {
+            "symbol": "MXF202501",
+            "close": 23500.0,
+            "open": 23400.0,
+            "high": 23600.0,
+            "low": 23300.0,
+            "buy_price": 23499.0,
+            "sell_price": 23501.0,
+            "change_price": 100.0,
+            "change_rate": 0.43,
+            "volume": 12345,
+            "ts": 1705395600000,
+        }
+        mock_queue_client.return_value.get_snapshot.return_value = mock_response
+        
+        response = client.get("/symbols/MXF202501/snapshot?simulation=true")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["close"] == 23500.0
+        assert data["buy_price"] == 23499.0
+        assert data["sell_price"] == 23501.0
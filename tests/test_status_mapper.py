@@ -8,7 +8,7 @@ OrderStatusMapper 單元測試
 4. 訂單記錄更新
 """
 import pytest
-from unittest.mock import MagicMock
+from types import SimpleNamespace
 
 from status_mapper import OrderStatusMapper
 
@@ -16,126 +16,81 @@ from status_mapper import OrderStatusMapper
 class TestMapFillStatus:
     """map_fill_status 方法測試"""
 
-    def test_Filled_應該映射為filled(self):
-        """測試: Filled 狀態應該映射為 filled"""
-        assert OrderStatusMapper.map_fill_status("Filled") == "filled"
-
-    def test_PartFilled_應該映射為partial_filled(self):
-        """測試: PartFilled 狀態應該映射為 partial_filled"""
-        assert OrderStatusMapper.map_fill_status("PartFilled") == "partial_filled"
-
-    def test_Cancelled_應該映射為cancelled(self):
-        """測試: Cancelled 狀態應該映射為 cancelled"""
-        assert OrderStatusMapper.map_fill_status("Cancelled") == "cancelled"
-
-    def test_Inactive_應該映射為cancelled(self):
-        """測試: Inactive 狀態應該映射為 cancelled（失效視同取消）"""
-        assert OrderStatusMapper.map_fill_status("Inactive") == "cancelled"
-
-    def test_Failed_應該映射為failed(self):
-        """測試: Failed 狀態應該映射為 failed"""
-        assert OrderStatusMapper.map_fill_status("Failed") == "failed"
-
-    def test_PendingSubmit_應該映射為submitted(self):
-        """測試: PendingSubmit 狀態應該映射為 submitted"""
-        assert OrderStatusMapper.map_fill_status("PendingSubmit") == "submitted"
-
-    def test_PreSubmitted_應該映射為submitted(self):
-        """測試: PreSubmitted 狀態應該映射為 submitted"""
-        assert OrderStatusMapper.map_fill_status("PreSubmitted") == "submitted"
-
-    def test_Submitted_應該映射為submitted(self):
-        """測試: Submitted 狀態應該映射為 submitted"""
-        assert OrderStatusMapper.map_fill_status("Submitted") == "submitted"
-
-    def test_未知狀態_應該映射為unknown(self):
-        """測試: 未知狀態應該映射為 unknown"""
-        assert OrderStatusMapper.map_fill_status("UnknownStatus") == "unknown"
-        assert OrderStatusMapper.map_fill_status("") == "unknown"
+    @pytest.mark.parametrize(
+        "raw, mapped",
+        [
+            ("Filled", "filled"),
+            ("PartFilled", "partial_filled"),
+            ("Cancelled", "cancelled"),
+            ("Inactive", "cancelled"),  # 失效視同取消
+            ("Failed", "failed"),
+            ("PendingSubmit", "submitted"),
+            ("PreSubmitted", "submitted"),
+            ("Submitted", "submitted"),
+            ("UnknownStatus", "unknown"),
+            ("", "unknown"),
+        ],
+    )
+    def test_狀態應該正確映射(self, raw, mapped):
+        """測試: Shioaji 狀態應該映射為對應的資料庫狀態，未知狀態映射為 unknown"""
+        assert OrderStatusMapper.map_fill_status(raw) == mapped
 
 
 class TestIsFinalStatus:
     """is_final_status 方法測試"""
 
-    def test_Filled_是最終狀態(self):
-        """測試: Filled 是最終狀態"""
-        assert OrderStatusMapper.is_final_status("Filled") is True
-
-    def test_Cancelled_是最終狀態(self):
-        """測試: Cancelled 是最終狀態"""
-        assert OrderStatusMapper.is_final_status("Cancelled") is True
-
-    def test_Inactive_是最終狀態(self):
-        """測試: Inactive 是最終狀態"""
-        assert OrderStatusMapper.is_final_status("Inactive") is True
-
-    def test_Failed_是最終狀態(self):
-        """測試: Failed 是最終狀態"""
-        assert OrderStatusMapper.is_final_status("Failed") is True
-
-    def test_Submitted_不是最終狀態(self):
-        """測試: Submitted 不是最終狀態"""
-        assert OrderStatusMapper.is_final_status("Submitted") is False
-
-    def test_PartFilled_不是最終狀態(self):
-        """測試: PartFilled 不是最終狀態（可能會繼續成交）"""
-        assert OrderStatusMapper.is_final_status("PartFilled") is False
-
-    def test_PendingSubmit_不是最終狀態(self):
-        """測試: PendingSubmit 不是最終狀態"""
-        assert OrderStatusMapper.is_final_status("PendingSubmit") is False
+    @pytest.mark.parametrize(
+        "status, expected",
+        [
+            ("Filled", True),
+            ("Cancelled", True),
+            ("Inactive", True),
+            ("Failed", True),
+            ("Submitted", False),
+            ("PartFilled", False),  # 可能會繼續成交
+            ("PendingSubmit", False),
+        ],
+    )
+    def test_最終狀態判斷(self, status, expected):
+        """測試: 只有 Filled/Cancelled/Inactive/Failed 是最終狀態"""
+        assert OrderStatusMapper.is_final_status(status) is expected
 
 
 class TestIsSuccessStatus:
     """is_success_status 方法測試"""
 
-    def test_Filled_是成功狀態(self):
-        """測試: Filled 是成功狀態"""
-        assert OrderStatusMapper.is_success_status("Filled") is True
-
-    def test_PartFilled_是成功狀態(self):
-        """測試: PartFilled 是成功狀態"""
-        assert OrderStatusMapper.is_success_status("PartFilled") is True
-
-    def test_Cancelled_不是成功狀態(self):
-        """測試: Cancelled 不是成功狀態"""
-        assert OrderStatusMapper.is_success_status("Cancelled") is False
-
-    def test_Failed_不是成功狀態(self):
-        """測試: Failed 不是成功狀態"""
-        assert OrderStatusMapper.is_success_status("Failed") is False
-
-    def test_Submitted_不是成功狀態(self):
-        """測試: Submitted 不是成功狀態（尚未成交）"""
-        assert OrderStatusMapper.is_success_status("Submitted") is False
+    @pytest.mark.parametrize(
+        "status, expected",
+        [
+            ("Filled", True),
+            ("PartFilled", True),
+            ("Cancelled", False),
+            ("Failed", False),
+            ("Submitted", False),  # 尚未成交
+        ],
+    )
+    def test_成功狀態判斷(self, status, expected):
+        """測試: 只有 Filled/PartFilled 是成功狀態"""
+        assert OrderStatusMapper.is_success_status(status) is expected
 
 
 class TestIsPendingStatus:
     """is_pending_status 方法測試"""
 
-    def test_PendingSubmit_是等待狀態(self):
-        """測試: PendingSubmit 是等待狀態"""
-        assert OrderStatusMapper.is_pending_status("PendingSubmit") is True
-
-    def test_PreSubmitted_是等待狀態(self):
-        """測試: PreSubmitted 是等待狀態"""
-        assert OrderStatusMapper.is_pending_status("PreSubmitted") is True
-
-    def test_Submitted_是等待狀態(self):
-        """測試: Submitted 是等待狀態"""
-        assert OrderStatusMapper.is_pending_status("Submitted") is True
-
-    def test_PartFilled_是等待狀態(self):
-        """測試: PartFilled 是等待狀態（等待剩餘成交）"""
-        assert OrderStatusMapper.is_pending_status("PartFilled") is True
-
-    def test_Filled_不是等待狀態(self):
-        """測試: Filled 不是等待狀態"""
-        assert OrderStatusMapper.is_pending_status("Filled") is False
-
-    def test_Cancelled_不是等待狀態(self):
-        """測試: Cancelled 不是等待狀態"""
-        assert OrderStatusMapper.is_pending_status("Cancelled") is False
+    @pytest.mark.parametrize(
+        "status, expected",
+        [
+            ("PendingSubmit", True),
+            ("PreSubmitted", True),
+            ("Submitted", True),
+            ("PartFilled", True),  # 等待剩餘成交
+            ("Filled", False),
+            ("Cancelled", False),
+        ],
+    )
+    def test_等待狀態判斷(self, status, expected):
+        """測試: 已送出但尚未完全成交的狀態是等待狀態"""
+        assert OrderStatusMapper.is_pending_status(status) is expected
 
 
 class TestUpdateOrderStatus:
@@ -144,8 +99,7 @@ class TestUpdateOrderStatus:
     def test_應該更新訂單狀態為mapped值(self):
         """測試: 應該將訂單狀態更新為映射後的值"""
         # Arrange
-        mock_order = MagicMock()
-        mock_order.status = "submitted"
+        mock_order = SimpleNamespace(status="submitted")
 
         # Act
         OrderStatusMapper.update_order_status(mock_order, "Filled")
@@ -156,8 +110,7 @@ class TestUpdateOrderStatus:
     def test_未知狀態不應該更新訂單(self):
         """測試: 未知狀態不應該更新訂單"""
         # Arrange
-        mock_order = MagicMock()
-        mock_order.status = "submitted"
+        mock_order = SimpleNamespace(status="submitted")
 
         # Act
         OrderStatusMapper.update_order_status(mock_order, "UnknownStatus")
@@ -168,8 +121,7 @@ class TestUpdateOrderStatus:
     def test_Inactive應該更新為cancelled(self):
         """測試: Inactive 應該將訂單狀態更新為 cancelled"""
         # Arrange
-        mock_order = MagicMock()
-        mock_order.status = "submitted"
+        mock_order = SimpleNamespace(status="submitted")
 
         # Act
         OrderStatusMapper.update_order_status(mock_order, "Inactive")
@@ -7,7 +7,8 @@ StrategySettings 單元測試
 3. 參數類型轉換
 """
 import pytest
-from unittest.mock import patch
+
+from strategy_config import StrategySettings
 
 
 class TestStrategySettings:
@@ -15,7 +16,6 @@ class TestStrategySettings:
 
     def test_預設值應該正確(self):
         """測試: 所有預設值應該符合策略規格"""
-        from strategy_config import StrategySettings
         settings = StrategySettings()
 
         assert settings.symbol == "MXFR1"
@@ -31,56 +31,25 @@ class TestStrategySettings:
         assert settings.state_persist_interval == 10
         assert settings.position_sync_interval == 60
 
-    def test_環境變數應該能覆蓋預設值(self):
-        """測試: 透過 STRATEGY_ 前綴的環境變數覆蓋設定"""
-        from strategy_config import StrategySettings
-        env = {
-            "STRATEGY_SYMBOL": "TXFR1",
-            "STRATEGY_QUANTITY": "5",
-            "STRATEGY_STOP_LOSS_POINTS": "100",
-            "STRATEGY_SIMULATION": "false",
-        }
-        with patch.dict("os.environ", env):
-            settings = StrategySettings()
-
-        assert settings.symbol == "TXFR1"
-        assert settings.quantity == 5
-        assert settings.stop_loss_points == 100
-        assert settings.simulation is False
-
-    def test_kline_interval_應該可自訂(self):
-        """測試: K 線週期可以透過環境變數修改"""
-        from strategy_config import StrategySettings
-        with patch.dict("os.environ", {"STRATEGY_KLINE_INTERVAL_MINUTES": "5"}):
-            settings = StrategySettings()
-
-        assert settings.kline_interval_minutes == 5
-
-    def test_ma_週期應該可自訂(self):
-        """測試: 均線週期可以透過環境變數修改"""
-        from strategy_config import StrategySettings
-        env = {
-            "STRATEGY_MA_FAST_PERIOD": "10",
-            "STRATEGY_MA_SLOW_PERIOD": "30",
-        }
-        with patch.dict("os.environ", env):
-            settings = StrategySettings()
+    @pytest.mark.parametrize(
+        "env_key, env_val, attr, expected",
+        [
+            ("STRATEGY_SYMBOL", "TXFR1", "symbol", "TXFR1"),
+            ("STRATEGY_QUANTITY", "5", "quantity", 5),
+            ("STRATEGY_STOP_LOSS_POINTS", "100", "stop_loss_points", 100),
+            ("STRATEGY_SIMULATION", "false", "simulation", False),
+            ("STRATEGY_KLINE_INTERVAL_MINUTES", "5", "kline_interval_minutes", 5),
+            ("STRATEGY_MA_FAST_PERIOD", "10", "ma_fast_period", 10),
+            ("STRATEGY_MA_SLOW_PERIOD", "30", "ma_slow_period", 30),
+            ("STRATEGY_DAILY_MAX_TRADES", "20", "daily_max_trades", 20),
+            ("STRATEGY_REDIS_URL", "redis://custom:6380/1", "redis_url", "redis://custom:6380/1"),
+        ],
+    )
+    def test_環境變數應該能覆蓋預設值(self, monkeypatch, env_key, env_val, attr, expected):
+        """測試: 透過 STRATEGY_ 前綴的環境變數覆蓋設定，並轉換為欄位型別"""
+        monkeypatch.setenv(env_key, env_val)
 
-        assert settings.ma_fast_period == 10
-        assert settings.ma_slow_period == 30
-
-    def test_daily_max_trades_應該可自訂(self):
-        """測試: 每日最大交易次數可以透過環境變數修改"""
-        from strategy_config import StrategySettings
-        with patch.dict("os.environ", {"STRATEGY_DAILY_MAX_TRADES": "20"}):
-            settings = StrategySettings()
-
-        assert settings.daily_max_trades == 20
-
-    def test_redis_url_應該可自訂(self):
-        """測試: Redis URL 可以透過環境變數修改"""
-        from strategy_config import StrategySettings
-        with patch.dict("os.environ", {"STRATEGY_REDIS_URL": "redis://custom:6380/1"}):
-            settings = StrategySettings()
+        settings = StrategySettings()
 
-        assert settings.redis_url == "redis://custom:6380/1"
+        assert getattr(settings, attr) == expected
+        assert type(getattr(settings, attr)) is type(expected)
@@ -19,60 +19,42 @@ from strategy_engine import (
 )
 
 
-class TestCalculateSMA:
-    """SMA 計算測試"""
+# 黃金交叉序列（MA3 從下方穿越 MA5）：下降趨勢（slow > fast）後突然反彈（fast > slow）
+GOLDEN_CROSS_PRICES = (100.0, 99.0, 98.0, 97.0, 96.0, 110.0)
+
+# 死亡交叉序列（MA3 從上方穿越 MA5）：上升趨勢（fast > slow）後突然下跌（fast < slow）
+DEATH_CROSS_PRICES = (96.0, 97.0, 98.0, 99.0, 100.0, 90.0)
+
 
-    def test_正常計算SMA(self):
-        """測試: SMA 應正確計算平均值"""
-        prices = [10.0, 20.0, 30.0, 40.0, 50.0]
-        assert calculate_sma(prices, 3) == 40.0  # (30+40+50)/3
-        assert calculate_sma(prices, 5) == 30.0  # (10+20+30+40+50)/5
+@pytest.fixture(scope="module")
+def engine():
+    """MA3/MA5 小週期引擎（evaluate 不修改引擎狀態，整個模組共用）"""
+    return StrategyEngine(ma_fast_period=3, ma_slow_period=5)
 
-    def test_資料不足時應返回None(self):
-        """測試: 資料不足時 SMA 應返回 None"""
-        prices = [10.0, 20.0]
-        assert calculate_sma(prices, 5) is None
 
-    def test_剛好足夠資料(self):
-        """測試: 資料剛好足夠時應正確計算"""
-        prices = [10.0, 20.0, 30.0]
-        assert calculate_sma(prices, 3) == 20.0
+class TestCalculateSMA:
+    """SMA 計算測試"""
+
+    @pytest.mark.parametrize(
+        "prices, period, expected",
+        [
+            ([10.0, 20.0, 30.0, 40.0, 50.0], 3, 40.0),  # (30+40+50)/3
+            ([10.0, 20.0, 30.0, 40.0, 50.0], 5, 30.0),  # (10+20+30+40+50)/5
+            ([10.0, 20.0], 5, None),                    # 資料不足
+            ([10.0, 20.0, 30.0], 3, 20.0),              # 剛好足夠資料
+        ],
+        ids=["正常計算SMA_週期3", "正常計算SMA_週期5", "資料不足時應返回None", "剛好足夠資料"],
+    )
+    def test_calculate_sma(self, prices, period, expected):
+        """測試: SMA 應正確計算最後 period 根的平均值，資料不足時返回 None"""
+        assert calculate_sma(prices, period) == expected
 
 
 class TestStrategyEngine:
     """策略引擎測試"""
 
-    def _make_engine(self, fast=3, slow=5):
-        """建立小週期引擎方便測試"""
-        return StrategyEngine(ma_fast_period=fast, ma_slow_period=slow)
-
-    def _make_golden_cross_prices(self):
-        """
-        建構黃金交叉序列：MA3 從下方穿越 MA5
-
-        設計：前幾根慢線高於快線，最後一根快線超越慢線
-        """
-        # 下降趨勢（slow > fast）
-        prices = [100.0, 99.0, 98.0, 97.0, 96.0]
-        # 突然反彈（fast > slow）
-        prices.append(110.0)
-        return prices
-
-    def _make_death_cross_prices(self):
-        """
-        建構死亡交叉序列：MA3 從上方穿越 MA5
-
-        設計：前幾根快線高於慢線，最後一根快線跌破慢線
-        """
-        # 上升趨勢（fast > slow）
-        prices = [96.0, 97.0, 98.0, 99.0, 100.0]
-        # 突然下跌（fast < slow）
-        prices.append(90.0)
-        return prices
-
-    def test_資料不足時應返回NONE(self):
+    def test_資料不足時應返回NONE(self, engine):
         """測試: 收盤價不足時應返回 NONE 訊號"""
-        engine = self._make_engine(fast=3, slow=5)
         prices = [100.0, 101.0, 102.0]  # 需要 6 根
 
         signal = engine.evaluate(prices)
@@ -80,69 +62,38 @@ class TestStrategyEngine:
         assert signal.action == SignalAction.NONE
         assert "資料不足" in signal.reason
 
-    def test_黃金交叉空倉時應做多(self):
-        """測試: 黃金交叉 + 空倉 → BUY"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_golden_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.FLAT)
-
-        assert signal.action == SignalAction.BUY
-        assert "黃金交叉" in signal.reason
-
-    def test_黃金交叉持空時應平倉(self):
-        """測試: 黃金交叉 + 持空 → CLOSE（準備反轉）"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_golden_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.SHORT)
-
-        assert signal.action == SignalAction.CLOSE
-        assert "平空單" in signal.reason
-
-    def test_黃金交叉持多時不重複進場(self):
-        """測試: 黃金交叉 + 已持多 → NONE"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_golden_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.LONG)
-
-        assert signal.action == SignalAction.NONE
-        assert "已持有多單" in signal.reason
-
-    def test_死亡交叉空倉時應做空(self):
-        """測試: 死亡交叉 + 空倉 → SELL"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_death_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.FLAT)
-
-        assert signal.action == SignalAction.SELL
-        assert "死亡交叉" in signal.reason
-
-    def test_死亡交叉持多時應平倉(self):
-        """測試: 死亡交叉 + 持多 → CLOSE（準備反轉）"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_death_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.LONG)
-
-        assert signal.action == SignalAction.CLOSE
-        assert "平多單" in signal.reason
-
-    def test_死亡交叉持空時不重複進場(self):
-        """測試: 死亡交叉 + 已持空 → NONE"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_death_cross_prices()
-
-        signal = engine.evaluate(prices, PositionDirection.SHORT)
-
-        assert signal.action == SignalAction.NONE
-        assert "已持有空單" in signal.reason
-
-    def test_無交叉時應返回NONE(self):
+    @pytest.mark.parametrize(
+        "prices, position, action, reason",
+        [
+            (GOLDEN_CROSS_PRICES, PositionDirection.FLAT, SignalAction.BUY, "黃金交叉"),
+            # 持空 → CLOSE（準備反轉）
+            (GOLDEN_CROSS_PRICES, PositionDirection.SHORT, SignalAction.CLOSE, "平空單"),
+            # 已持多 → 不重複進場
+            (GOLDEN_CROSS_PRICES, PositionDirection.LONG, SignalAction.NONE, "已持有多單"),
+            (DEATH_CROSS_PRICES, PositionDirection.FLAT, SignalAction.SELL, "死亡交叉"),
+            # 持多 → CLOSE（準備反轉）
+            (DEATH_CROSS_PRICES, PositionDirection.LONG, SignalAction.CLOSE, "平多單"),
+            # 已持空 → 不重複進場
+            (DEATH_CROSS_PRICES, PositionDirection.SHORT, SignalAction.NONE, "已持有空單"),
+        ],
+        ids=[
+            "黃金交叉空倉時應做多",
+            "黃金交叉持空時應平倉",
+            "黃金交叉持多時不重複進場",
+            "死亡交叉空倉時應做空",
+            "死亡交叉持多時應平倉",
+            "死亡交叉持空時不重複進場",
+        ],
+    )
+    def test_交叉訊號依持倉方向決定動作(self, engine, prices, position, action, reason):
+        """測試: 黃金/死亡交叉依目前持倉產生進場、平倉或不動作訊號"""
+        signal = engine.evaluate(prices, position)
+
+        assert signal.action == action
+        assert reason in signal.reason
+
+    def test_無交叉時應返回NONE(self, engine):
         """測試: 無交叉時應返回 NONE"""
-        engine = self._make_engine(fast=3, slow=5)
         # 穩定上升，不會交叉
         prices = [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
 
@@ -150,10 +101,9 @@ class TestStrategyEngine:
 
         assert signal.action == SignalAction.NONE
 
-    def test_signal應包含MA值(self):
+    def test_signal應包含MA值(self, engine):
         """測試: 訊號應包含 MA 快線和慢線數值"""
-        engine = self._make_engine(fast=3, slow=5)
-        prices = self._make_golden_cross_prices()
+        prices = GOLDEN_CROSS_PRICES
 
         signal = engine.evaluate(prices, PositionDirection.FLAT)
 
@@ -10,8 +10,9 @@ StrategyEventStorage 單元測試
 """
 import pytest
 import time
-from unittest.mock import Mock, MagicMock, patch, call
+from unittest.mock import Mock, MagicMock, call
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 from strategy_event_storage import StrategyEventStorage, MAX_WRITE_RETRIES
 
@@ -26,43 +27,75 @@ def _make_event(event_type, symbol="MXFR1", data=None, timestamp_ms=None):
     }
 
 
-class TestStrategyEventStorageInit:
-    """初始化測試"""
+def _set_open_trade(db, trade):
+    """設定 _handle_exit 查詢未平倉交易（query → filter → order_by → first）的結果"""
+    db.query.return_value.filter.return_value.order_by.return_value.first.return_value = trade
 
-    def test_初始化應該使用預設參數(self):
-        storage = StrategyEventStorage(enabled=False)
 
-        assert storage._buffer_size == 20
-        assert storage._flush_interval == 2.0
-        assert storage._enabled is False
-        assert storage._total_events_stored == 0
-        assert storage._total_trades_created == 0
+@pytest.fixture
+def storage():
+    """啟用但不啟動背景執行緒的 StrategyEventStorage（由測試手動呼叫 _flush_buffer）"""
+    s = StrategyEventStorage(enabled=False, buffer_size=100, flush_interval=999)
+    s._enabled = True
+    return s
 
-    def test_初始化可覆蓋參數(self):
-        storage = StrategyEventStorage(
-            buffer_size=50,
-            flush_interval=5.0,
-            enabled=False,
-        )
 
-        assert storage._buffer_size == 50
-        assert storage._flush_interval == 5.0
+@pytest.fixture
+def mock_session(monkeypatch):
+    """以 MagicMock 取代 SessionLocal 建立的資料庫 Session"""
+    db = MagicMock()
+    monkeypatch.setattr("strategy_event_storage.SessionLocal", lambda: db)
+    return db
 
-    def test_停用時不啟動背景執行緒(self):
-        storage = StrategyEventStorage(enabled=False)
 
-        assert storage._running is False
-        assert storage._flush_thread is None
+@pytest.fixture
+def open_trade(mock_session):
+    """查詢未平倉交易時返回的多單交易回合（entry_price=21000）
+
+    _handle_exit 只讀寫屬性，使用 SimpleNamespace 即可
+    """
+    trade = SimpleNamespace(direction="long", entry_price=21000.0)
+    _set_open_trade(mock_session, trade)
+    return trade
+
+
+class TestStrategyEventStorageInit:
+    """初始化測試"""
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            (
+                dict(enabled=False),
+                dict(
+                    _buffer_size=20,
+                    _flush_interval=2.0,
+                    _enabled=False,
+                    _total_events_stored=0,
+                    _total_trades_created=0,
+                    # 停用時不啟動背景執行緒
+                    _running=False,
+                    _flush_thread=None,
+                ),
+            ),
+            (
+                dict(buffer_size=50, flush_interval=5.0, enabled=False),
+                dict(_buffer_size=50, _flush_interval=5.0),
+            ),
+        ],
+        ids=["預設參數", "覆蓋參數"],
+    )
+    def test_初始化(self, kwargs, expected):
+        storage = StrategyEventStorage(**kwargs)
+
+        for attr, value in expected.items():
+            assert getattr(storage, attr) == value, attr
 
 
 class TestAddEvent:
     """add_event 測試"""
 
-    def test_add_event_應該加入緩衝區(self):
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        # 手動停止背景執行緒避免干擾
-        storage._running = False
-
+    def test_add_event_應該加入緩衝區(self, storage):
         event = _make_event("entry", data={"direction": "long", "price": 21000})
         result = storage.add_event(event)
 
@@ -78,10 +111,7 @@ class TestAddEvent:
         assert result is False
         assert len(storage._buffer) == 0
 
-    def test_add_event_缺少必要欄位應該返回False(self):
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
+    def test_add_event_缺少必要欄位應該返回False(self, storage):
         # 缺少 event_type
         result = storage.add_event({"symbol": "MXFR1"})
         assert result is False
@@ -90,12 +120,11 @@ class TestAddEvent:
         result = storage.add_event({"event_type": "entry"})
         assert result is False
 
-    def test_add_event_多筆應該正確累計(self):
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
-        for i in range(5):
-            storage.add_event(_make_event("signal", data={"action": "Buy"}))
+    def test_add_event_多筆應該正確累計(self, storage):
+        # 固定時間戳建立一次事件範本，每筆只複製外層字典
+        template = _make_event("signal", data={"action": "Buy"}, timestamp_ms=1700000000000)
+        for _ in range(5):
+            storage.add_event(dict(template))
 
         assert len(storage._buffer) == 5
 
@@ -103,14 +132,7 @@ class TestAddEvent:
 class TestFlushBuffer:
     """_flush_buffer 與 _process_events 測試"""
 
-    @patch("strategy_event_storage.SessionLocal")
-    def test_flush_buffer_應該批次寫入資料庫(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
+    def test_flush_buffer_應該批次寫入資料庫(self, mock_session, storage):
         # 加入事件
         storage.add_event(_make_event("signal", data={"action": "Buy", "price": 21000}))
         storage.add_event(_make_event("signal", data={"action": "Sell", "price": 20500}))
@@ -119,19 +141,12 @@ class TestFlushBuffer:
         storage._flush_buffer()
 
         # 應該呼叫 commit
-        mock_db.commit.assert_called_once()
-        mock_db.close.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.close.assert_called_once()
         assert storage._total_events_stored == 2
         assert len(storage._buffer) == 0
 
-    @patch("strategy_event_storage.SessionLocal")
-    def test_entry_事件應該建立strategy_trade(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
+    def test_entry_事件應該建立strategy_trade(self, mock_session, storage):
         event = _make_event("entry", data={
             "direction": "long",
             "price": 21000,
@@ -141,23 +156,10 @@ class TestFlushBuffer:
         storage._flush_buffer()
 
         # 應該呼叫 db.add 兩次：一次 StrategyEvent，一次 StrategyTrade
-        assert mock_db.add.call_count == 2
+        assert mock_session.add.call_count == 2
         assert storage._total_trades_created == 1
 
-    @patch("strategy_event_storage.SessionLocal")
-    def test_exit_事件應該關閉對應的strategy_trade(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        # 模擬找到 open trade
-        mock_open_trade = MagicMock()
-        mock_open_trade.direction = "long"
-        mock_open_trade.entry_price = 21000.0
-        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = mock_open_trade
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
+    def test_exit_事件應該關閉對應的strategy_trade(self, open_trade, storage):
         event = _make_event("exit", data={
             "price": 21050,
             "pnl": 50.0,
@@ -167,24 +169,12 @@ class TestFlushBuffer:
         storage._flush_buffer()
 
         # trade 應該被關閉
-        assert mock_open_trade.status == "closed"
-        assert mock_open_trade.exit_price == 21050
-        assert mock_open_trade.exit_reason == "signal"
+        assert open_trade.status == "closed"
+        assert open_trade.exit_price == 21050
+        assert open_trade.exit_reason == "signal"
         assert storage._total_trades_closed == 1
 
-    @patch("strategy_event_storage.SessionLocal")
-    def test_stop_loss_事件應該記錄停損原因(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        mock_open_trade = MagicMock()
-        mock_open_trade.direction = "long"
-        mock_open_trade.entry_price = 21000.0
-        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = mock_open_trade
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
+    def test_stop_loss_事件應該記錄停損原因(self, open_trade, storage):
         event = _make_event("stop_loss", data={
             "price": 20950,
             "reason": "trailing",
@@ -194,57 +184,30 @@ class TestFlushBuffer:
         storage._flush_buffer()
 
         # 應該記錄停損原因
-        assert mock_open_trade.exit_reason == "trailing"
-        assert mock_open_trade.status == "closed"
-
-    @patch("strategy_event_storage.SessionLocal")
-    def test_交易回合配對應該正確計算pnl_做多(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        mock_open_trade = MagicMock()
-        mock_open_trade.direction = "long"
-        mock_open_trade.entry_price = 21000.0
-        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = mock_open_trade
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
-        event = _make_event("exit", data={"price": 21050, "direction": "long"})
-        storage.add_event(event)
-        storage._flush_buffer()
-
-        # 做多: exit - entry = 21050 - 21000 = 50
-        assert mock_open_trade.pnl == 50.0
-
-    @patch("strategy_event_storage.SessionLocal")
-    def test_交易回合配對應該正確計算pnl_做空(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-
-        mock_open_trade = MagicMock()
-        mock_open_trade.direction = "short"
-        mock_open_trade.entry_price = 21000.0
-        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = mock_open_trade
-
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
-
-        event = _make_event("exit", data={"price": 20950, "direction": "short"})
+        assert open_trade.exit_reason == "trailing"
+        assert open_trade.status == "closed"
+
+    @pytest.mark.parametrize(
+        "direction, exit_price, expected_pnl",
+        [
+            ("long", 21050, 50.0),   # 做多: exit - entry = 21050 - 21000
+            ("short", 20950, 50.0),  # 做空: entry - exit = 21000 - 20950
+        ],
+        ids=["做多", "做空"],
+    )
+    def test_交易回合配對應該正確計算pnl(
+        self, open_trade, storage, direction, exit_price, expected_pnl
+    ):
+        open_trade.direction = direction
+
+        event = _make_event("exit", data={"price": exit_price, "direction": direction})
         storage.add_event(event)
         storage._flush_buffer()
 
-        # 做空: entry - exit = 21000 - 20950 = 50
-        assert mock_open_trade.pnl == 50.0
-
-    @patch("strategy_event_storage.SessionLocal")
-    def test_exit_無對應open_trade時應該記錄警告(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
-        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = None
+        assert open_trade.pnl == expected_pnl
 
-        storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
-        storage._running = False
+    def test_exit_無對應open_trade時應該記錄警告(self, mock_session, storage):
+        _set_open_trade(mock_session, None)
 
         event = _make_event("exit", data={"price": 21050})
         storage.add_event(event)
@@ -287,11 +250,16 @@ class TestStartStop:
         # 清理
         storage.stop()
 
-    @patch("strategy_event_storage.SessionLocal")
-    def test_stop_應該刷新剩餘緩衝區(self, mock_session_cls):
-        mock_db = MagicMock()
-        mock_session_cls.return_value = mock_db
+    def test_stop_不必等待flush_interval即結束背景執行緒(self):
+        storage = StrategyEventStorage(enabled=True, flush_interval=999)
+        flush_thread = storage._flush_thread
+
+        storage.stop()
+
+        # 背景執行緒應由 stop 喚醒後結束，而非等到 join 逾時
+        assert flush_thread.is_alive() is False
 
+    def test_stop_應該刷新剩餘緩衝區(self, mock_session):
         storage = StrategyEventStorage(enabled=True, buffer_size=100, flush_interval=999)
 
         # 加入事件
@@ -301,4 +269,4 @@ class TestStartStop:
         storage.stop()
 
         # 應該有刷新
-        mock_db.commit.assert_called()
+        mock_session.commit.assert_called()
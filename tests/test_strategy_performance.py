@@ -7,11 +7,19 @@
 3. 獲利因子計算
 4. 每日損益摘要
 5. 邊界情況
+6. 績效 API 結果快取
 """
 import pytest
-from unittest.mock import MagicMock
+from types import SimpleNamespace
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _dec(value):
+    """輔助函數：建立 Decimal（測試重複使用少數幾個數值，Decimal 不可變可共用）"""
+    return Decimal(str(value))
 
 
 def _make_mock_trade(
@@ -24,60 +32,49 @@ def _make_mock_trade(
     exit_reason="signal",
     symbol="MXFR1",
 ):
-    """輔助函數：建立模擬交易"""
-    trade = MagicMock()
-    trade.symbol = symbol
-    trade.direction = direction
-    trade.entry_price = Decimal(str(entry_price))
-    trade.exit_price = Decimal(str(exit_price))
-    trade.pnl = Decimal(str(pnl))
-    trade.entry_time = entry_time or datetime(2026, 2, 10, 9, 0, 0, tzinfo=timezone.utc)
-    trade.exit_time = exit_time or datetime(2026, 2, 10, 9, 30, 0, tzinfo=timezone.utc)
-    trade.exit_reason = exit_reason
-    trade.status = "closed"
-    trade.quantity = 1
-    return trade
-
-
-# 直接 import _calculate_performance 函數
-# 需要 mock 掉 main.py 的一些依賴才能 import
-def _get_calculate_performance():
-    """取得 _calculate_performance 函數"""
-    import importlib
-    import sys
-
-    # mock 掉 main.py 不需要的依賴
-    from unittest.mock import MagicMock
-
-    # 建立需要的 mock
-    mock_modules = {}
-    for mod_name in [
-        'redis.asyncio', 'trading_queue', 'websocket_manager',
-        'status_mapper', 'analysis_levels_client',
-    ]:
-        if mod_name not in sys.modules:
-            mock_modules[mod_name] = MagicMock()
-
-    # 暫時加入 mock
-    for name, mod in mock_modules.items():
-        sys.modules[name] = mod
-
-    try:
-        from main import _calculate_performance
-        return _calculate_performance
-    finally:
-        # 清理 mock
-        for name in mock_modules:
-            if name in sys.modules and sys.modules[name] is mock_modules[name]:
-                del sys.modules[name]
+    """輔助函數：建立模擬交易
+
+    _calculate_performance 只讀取屬性，使用 SimpleNamespace 即可；價格與損益
+    維持 Decimal，與 StrategyTrade 的 Numeric 欄位從資料庫讀出的型別相同
+    """
+    return SimpleNamespace(
+        symbol=symbol,
+        direction=direction,
+        entry_price=_dec(entry_price),
+        exit_price=_dec(exit_price),
+        pnl=_dec(pnl),
+        entry_time=entry_time or datetime(2026, 2, 10, 9, 0, 0, tzinfo=timezone.utc),
+        exit_time=exit_time or datetime(2026, 2, 10, 9, 30, 0, tzinfo=timezone.utc),
+        exit_reason=exit_reason,
+        status="closed",
+        quantity=1,
+    )
+
+
+@pytest.fixture(scope="module")
+def calculate_performance(main_module):
+    """取得 main._calculate_performance"""
+    return main_module._calculate_performance
+
+
+@pytest.fixture(scope="module")
+def daily_summary(main_module):
+    """取得 main._daily_summary（每日損益聚合）"""
+    return main_module._daily_summary
+
+
+@pytest.fixture(scope="module")
+def attach_cumulative_pnl(main_module):
+    """取得 main._attach_cumulative_pnl（每日摘要累計損益，與 API 共用同一實作）"""
+    return main_module._attach_cumulative_pnl
 
 
 class TestPerformanceCalculation:
     """績效計算測試"""
 
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.calc = _get_calculate_performance()
+    def setup(self, calculate_performance):
+        self.calc = calculate_performance
 
     def test_performance_空交易列表應返回零值(self):
         result = self.calc([])
@@ -87,6 +84,13 @@ class TestPerformanceCalculation:
         assert result["total_pnl"] == 0
         assert result["sharpe_ratio"] == 0
 
+    def test_performance_空交易列表每次應返回獨立字典(self):
+        first = self.calc([])
+        first["total_trades"] = 99
+
+        assert self.calc([])["total_trades"] == 0
+        assert self.calc([], drawdown_lookback=5)["max_drawdown_window"] == 0
+
     def test_performance_應該正確計算勝率(self):
         trades = [
             _make_mock_trade(pnl=50),
@@ -150,6 +154,13 @@ class TestPerformanceCalculation:
         # 無虧損 → profit_factor = inf → None
         assert result["profit_factor"] is None
 
+    def test_performance_全部損益為零時獲利因子應為零(self):
+        trades = [_make_mock_trade(pnl=0), _make_mock_trade(pnl=0)]
+
+        result = self.calc(trades)
+
+        assert result["profit_factor"] == 0
+
     def test_performance_應該正確計算最大回撤(self):
         # 損益序列: +50, -30, +40, -60, +20
         # 累計: 50, 20, 60, 0, 20
@@ -168,6 +179,31 @@ class TestPerformanceCalculation:
 
         assert result["max_drawdown"] == 60.0
 
+    @pytest.mark.parametrize(
+        "lookback, expected",
+        [
+            (1, 30.0),   # 只比較前一筆：20 → -10
+            (2, 60.0),   # 前兩筆內高點 50 → -10
+            (10, 70.0),  # 視窗涵蓋全期，與 max_drawdown 相同：50 → -20
+        ],
+    )
+    def test_performance_應該正確計算回看視窗最大回撤(self, lookback, expected):
+        # 損益序列: +50, -30, -30, +10, -20
+        # 權益曲線（含起始 0）: 0, 50, 20, -10, 0, -20
+        trades = [_make_mock_trade(pnl=p) for p in (50, -30, -30, 10, -20)]
+
+        result = self.calc(trades, drawdown_lookback=lookback)
+
+        assert result["max_drawdown_window"] == expected
+        assert result["max_drawdown"] == 70.0
+
+    def test_performance_未指定回看筆數時不計算視窗回撤(self):
+        trades = [_make_mock_trade(pnl=50), _make_mock_trade(pnl=-30)]
+
+        result = self.calc(trades)
+
+        assert result["max_drawdown_window"] is None
+
     def test_performance_應該正確計算最大連續勝負(self):
         trades = [
             _make_mock_trade(pnl=10),
@@ -202,6 +238,15 @@ class TestPerformanceCalculation:
 
         assert result["sharpe_ratio"] == expected_sharpe
 
+    @pytest.mark.parametrize("pnl, count", [(0.1, 3), (33.3, 7)])
+    def test_performance_損益全部相同時夏普比率應為零(self, pnl, count):
+        # 非整數損益的平均值帶有浮點誤差，標準差仍應恰為 0
+        trades = [_make_mock_trade(pnl=pnl) for _ in range(count)]
+
+        result = self.calc(trades)
+
+        assert result["sharpe_ratio"] == 0
+
     def test_performance_單筆交易夏普比率應為零(self):
         trades = [_make_mock_trade(pnl=50)]
 
@@ -228,10 +273,39 @@ class TestPerformanceCalculation:
         assert result["avg_duration_seconds"] == 2700.0
 
 
+class TestPerformanceCache:
+    """績效 API 結果快取（_PerformanceCache）測試"""
+
+    @pytest.fixture
+    def cache(self, main_module):
+        return main_module._PerformanceCache(max_size=2)
+
+    def test_cache_命中時應回傳獨立字典(self, cache):
+        cache.put(("MXFR1", 3), {"total_pnl": 8.75})
+
+        first = cache.get(("MXFR1", 3))
+        first["total_pnl"] = 999  # 修改回傳值不應影響快取內容
+
+        assert cache.get(("MXFR1", 3)) == {"total_pnl": 8.75}
+        assert cache.get(("MXFR1", 4)) is None
+        assert cache.get_stats()["hits"] == 2
+        assert cache.get_stats()["misses"] == 1
+
+    def test_cache_超過容量時應淘汰最久未使用的項目(self, cache):
+        cache.put(("a",), {"v": 1})
+        cache.put(("b",), {"v": 2})
+        cache.get(("a",))  # a 變為最近使用
+        cache.put(("c",), {"v": 3})
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == {"v": 1}
+        assert cache.get_stats()["size"] == 2
+
+
 class TestDailySummary:
     """每日損益摘要測試（針對 API 回傳結構驗證）"""
 
-    def test_daily_summary_結構驗證(self):
+    def test_daily_summary_結構驗證(self, attach_cumulative_pnl):
         """驗證每日摘要的累計損益計算邏輯"""
         # 模擬兩天的交易資料
         daily_data = [
@@ -240,27 +314,45 @@ class TestDailySummary:
         ]
 
         # 計算累計損益
-        cumulative = 0
-        for d in daily_data:
-            cumulative += d["total_pnl"]
-            d["cumulative_pnl"] = cumulative
+        attach_cumulative_pnl(daily_data)
 
         assert daily_data[0]["cumulative_pnl"] == 80
         assert daily_data[1]["cumulative_pnl"] == 50
 
-    def test_daily_summary_應該正確聚合每日損益(self):
-        """驗證每日聚合邏輯"""
-        # 模擬同一天的多筆交易
+    def test_daily_summary_應該正確聚合每日損益(self, daily_summary):
+        """驗證每日聚合邏輯（直接驗證 API 使用的 _daily_summary）"""
         pnls_day1 = [50, -20, 30]   # 總計 +60
         pnls_day2 = [-40, 10]       # 總計 -30
+        trades = [
+            _make_mock_trade(pnl=p, entry_time=datetime(2026, 2, day, 1, i, tzinfo=timezone.utc))
+            for day, pnls in ((10, pnls_day1), (11, pnls_day2))
+            for i, p in enumerate(pnls)
+        ]
 
-        total_day1 = sum(pnls_day1)
-        total_day2 = sum(pnls_day2)
+        day1, day2 = daily_summary(trades)
+
+        assert day1["total_pnl"] == 60
+        assert day2["total_pnl"] == -30
+        assert day1["winning_trades"] == 2
+        assert day1["losing_trades"] == 1
+
+    def test_daily_summary_應依台灣時區日期分組並累計(self, daily_summary):
+        def at(day, hour):
+            return datetime(2026, 2, day, hour, 0, 0, tzinfo=timezone.utc)
+
+        # UTC 2/10 16:00 為台灣 2/11 00:00，應歸入 2/11
+        trades = [
+            _make_mock_trade(pnl=50, entry_time=at(10, 1)),
+            _make_mock_trade(pnl=-20, entry_time=at(10, 2)),
+            _make_mock_trade(pnl=30, entry_time=at(10, 16)),
+            _make_mock_trade(pnl=-40, entry_time=at(11, 3)),
+        ]
 
-        winning_day1 = sum(1 for p in pnls_day1 if p > 0)
-        losing_day1 = sum(1 for p in pnls_day1 if p < 0)
+        result = daily_summary(trades)
 
-        assert total_day1 == 60
-        assert total_day2 == -30
-        assert winning_day1 == 2
-        assert losing_day1 == 1
+        assert [d["date"] for d in result] == ["2026-02-10", "2026-02-11"]
+        assert [d["trade_count"] for d in result] == [2, 2]
+        assert [d["total_pnl"] for d in result] == [30.0, -10.0]
+        assert [d["winning_trades"] for d in result] == [1, 1]
+        assert [d["losing_trades"] for d in result] == [1, 1]
+        assert [d["cumulative_pnl"] for d in result] == [30.0, 20.0]
@@ -0,0 +1,93 @@
+"""
+策略績效 API 端點測試
+
+測試涵蓋：
+1. GET /strategy/performance - 相同篩選條件與交易統計時命中快取
+2. GET /strategy/performance/cache - 快取統計
+"""
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+pytestmark = pytest.mark.api
+
+
+@pytest.fixture
+def performance_cache(main_module, monkeypatch):
+    """每個測試使用全新的績效快取，避免受其他測試的查詢影響"""
+    cache = main_module._PerformanceCache()
+    monkeypatch.setattr(main_module, "_performance_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def mock_db(main_module, client):
+    """覆蓋 get_db 依賴為 MagicMock，測試結束後移除覆蓋"""
+    db = MagicMock()
+    main_module.app.dependency_overrides[main_module.get_db] = lambda: db
+    yield db
+    main_module.app.dependency_overrides.pop(main_module.get_db, None)
+
+
+def _set_closed_trades(db, trades, last_id):
+    """設定 query → filter → with_entities 的聚合統計與交易查詢結果"""
+    query = db.query.return_value.filter.return_value
+    last_exit_time = max((t.exit_time for t in trades), default=None)
+    stats = query.with_entities.return_value
+    stats.one.return_value = (len(trades), last_id, last_exit_time)
+    stats.order_by.return_value.all.return_value = trades
+    return stats
+
+
+def _trade(pnl, minute):
+    return SimpleNamespace(
+        pnl=pnl,
+        entry_time=datetime(2026, 2, 10, 9, minute, tzinfo=timezone.utc),
+        exit_time=datetime(2026, 2, 10, 9, minute + 5, tzinfo=timezone.utc),
+    )
+
+
+class TestStrategyPerformanceAPI:
+    """績效 API 快取測試"""
+
+    def test_相同交易統計時第二次查詢應命中快取(self, client, mock_db, performance_cache):
+        stats = _set_closed_trades(mock_db, [_trade(50, 0), _trade(-20, 10)], last_id=2)
+
+        first = client.get("/strategy/performance")
+        second = client.get("/strategy/performance")
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert first.json()["total_pnl"] == 30.0
+        # 交易只在第一次查詢時載入
+        assert stats.order_by.return_value.all.call_count == 1
+
+        cache_stats = client.get("/strategy/performance/cache").json()
+        assert cache_stats["hits"] == 1
+        assert cache_stats["misses"] == 1
+        assert cache_stats["hit_rate"] == 50.0
+        assert cache_stats["size"] == 1
+
+    def test_新增交易後應重新計算(self, client, mock_db, performance_cache):
+        _set_closed_trades(mock_db, [_trade(50, 0)], last_id=1)
+        client.get("/strategy/performance")
+
+        stats = _set_closed_trades(mock_db, [_trade(50, 0), _trade(-20, 10)], last_id=2)
+        response = client.get("/strategy/performance")
+
+        assert response.json()["total_pnl"] == 30.0
+        assert stats.order_by.return_value.all.call_count == 2  # 兩次查詢都載入交易
+        assert performance_cache.get_stats()["misses"] == 2
+
+    def test_cache統計_未查詢時應為零(self, client, performance_cache):
+        response = client.get("/strategy/performance/cache")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0,
+            "size": 0,
+            "max_size": 128,
+        }
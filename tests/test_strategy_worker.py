@@ -10,67 +10,112 @@ StrategyWorker 單元測試
 import pytest
 from unittest.mock import MagicMock, patch, call
 
-from strategy_worker import StrategyWorker
-from trading_queue import TradingResponse
-
-
-def _create_worker():
-    """建立測試用 StrategyWorker（跳過 Redis 連線）"""
+from strategy_event_storage import StrategyEventStorage
+from strategy_worker import StrategyWorker, is_false_exit_success
+from trading_queue import TradingQueueClient, TradingResponse
+
+
+@pytest.fixture(scope="module")
+def create_worker():
+    """
+    返回建立測試用 StrategyWorker 的函式（跳過 Redis 連線）
+
+    redis.from_url 與 StrategyEventStorage 的替換在整個模組只進入一次，
+    每次呼叫仍建立全新的 StrategyWorker 與事件儲存 Mock。
+    下單客戶端與事件儲存以真實類別作為 spec，拼錯方法名稱會直接拋出 AttributeError。
+    stub_side_effects=True（預設）時 _publish_event 與 _save_order_history 直接換成
+    MagicMock，測試可讀取其 call_args，不必再以 patch.object 包住；
+    要測試這兩個方法本身時傳入 False。
+    """
     with patch("strategy_worker.redis.from_url") as mock_redis, \
          patch("strategy_worker.StrategyEventStorage") as mock_storage:
         mock_redis.return_value = MagicMock()
-        mock_storage_instance = MagicMock()
-        mock_storage.return_value = mock_storage_instance
 
-        worker = StrategyWorker()
-        worker._trading_client = MagicMock()
-        worker._event_storage = mock_storage_instance
-        return worker
+        def make(stub_side_effects=True):
+            mock_storage_instance = MagicMock(spec=StrategyEventStorage)
+            mock_storage.return_value = mock_storage_instance
+
+            worker = StrategyWorker()
+            worker._trading_client = MagicMock(spec=TradingQueueClient)
+            worker._event_storage = mock_storage_instance
+            if stub_side_effects:
+                worker._publish_event = MagicMock()
+                worker._save_order_history = MagicMock()
+            return worker
+
+        yield make
 
 
 def _make_response(success=True, data=None, error=None):
-    """建立 TradingResponse（含必要的 request_id）"""
+    """
+    建立 TradingResponse（含必要的 request_id）
+
+    每次返回新的實例並複製 data，worker 或測試修改回應內容時不會影響其他測試。
+    """
     return TradingResponse(
         request_id="test-req-001",
         success=success,
-        data=data,
+        data=dict(data) if data is not None else None,
         error=error,
     )
 
 
-class TestPlaceExitPositionDirection:
-    """測試 _place_exit 的 position_direction 傳值"""
+class _StubDB:
+    """
+    SessionLocal() 返回的資料庫 Session 替身
 
-    def test_做多平倉應傳送Buy(self):
-        worker = _create_worker()
-        worker._position_manager.open_position("long", 21000.0)
+    _save_order_history 只呼叫 add/commit/rollback/close，以簡單類別記錄呼叫次數，
+    不需要 MagicMock 的呼叫歷史與自動屬性。
+    """
 
-        response = _make_response(data={"order_id": "abc123", "code": "MXFA6"})
-        worker._trading_client.place_exit_order.return_value = response
+    def __init__(self, commit_error=None):
+        self.added = []
+        self.commit_count = 0
+        self.rollback_count = 0
+        self.close_count = 0
+        self._commit_error = commit_error
 
-        with patch.object(worker, "_save_order_history"):
-            worker._place_exit(21050.0)
+    def add(self, obj):
+        self.added.append(obj)
 
-        worker._trading_client.place_exit_order.assert_called_once()
-        call_kwargs = worker._trading_client.place_exit_order.call_args
-        assert call_kwargs.kwargs.get("position_direction") == "Buy"
+    def commit(self):
+        if self._commit_error is not None:
+            raise self._commit_error
+        self.commit_count += 1
+
+    def rollback(self):
+        self.rollback_count += 1
 
-    def test_做空平倉應傳送Sell(self):
-        worker = _create_worker()
-        worker._position_manager.open_position("short", 21000.0)
+    def close(self):
+        self.close_count += 1
+
+
+class TestPlaceExitPositionDirection:
+    """測試 _place_exit 的 position_direction 傳值"""
+
+    @pytest.mark.parametrize(
+        "direction, exit_price, expected",
+        [
+            ("long", 21050.0, "Buy"),
+            ("short", 20950.0, "Sell"),
+        ],
+        ids=["做多平倉應傳送Buy", "做空平倉應傳送Sell"],
+    )
+    def test_平倉應傳送原持倉方向(self, create_worker, direction, exit_price, expected):
+        worker = create_worker()
+        worker._position_manager.open_position(direction, 21000.0)
 
         response = _make_response(data={"order_id": "abc123", "code": "MXFA6"})
         worker._trading_client.place_exit_order.return_value = response
 
-        with patch.object(worker, "_save_order_history"):
-            worker._place_exit(20950.0)
+        worker._place_exit(exit_price)
 
         worker._trading_client.place_exit_order.assert_called_once()
         call_kwargs = worker._trading_client.place_exit_order.call_args
-        assert call_kwargs.kwargs.get("position_direction") == "Sell"
+        assert call_kwargs.kwargs.get("position_direction") == expected
 
-    def test_空倉時不應下單(self):
-        worker = _create_worker()
+    def test_空倉時不應下單(self, create_worker):
+        worker = create_worker()
         # 預設是 flat，不做任何操作
 
         worker._place_exit(21000.0)
@@ -81,8 +126,21 @@ class TestPlaceExitPositionDirection:
 class TestPlaceExitFalseSuccess:
     """測試平倉假成功檢測"""
 
-    def test_order_id為None且有message應偵測為假成功(self):
-        worker = _create_worker()
+    @pytest.mark.parametrize(
+        "result_data, expected",
+        [
+            ({"order_id": None, "message": "No position to exit"}, True),
+            ({"order_id": "abc123", "code": "MXFA6"}, False),
+            ({"order_id": None}, False),
+            ({}, False),
+        ],
+        ids=["無order_id有message", "有order_id", "無order_id無message", "空回應"],
+    )
+    def test_is_false_exit_success(self, result_data, expected):
+        assert is_false_exit_success(result_data) is expected
+
+    def test_order_id為None且有message應偵測為假成功(self, create_worker):
+        worker = create_worker()
         worker._position_manager.open_position("long", 21000.0)
 
         response = _make_response(data={"order_id": None, "message": "No position to exit"})
@@ -93,8 +151,8 @@ class TestPlaceExitFalseSuccess:
         # 假成功：持倉應被清除
         assert worker._position_manager.is_flat
 
-    def test_假成功時清除pending_reverse(self):
-        worker = _create_worker()
+    def test_假成功時清除pending_reverse(self, create_worker):
+        worker = create_worker()
         worker._position_manager.open_position("long", 21000.0)
         worker._pending_reverse = "short"  # 模擬反轉等待
 
@@ -105,25 +163,24 @@ class TestPlaceExitFalseSuccess:
 
         assert worker._pending_reverse is None
 
-    def test_假成功不發布exit事件(self):
-        worker = _create_worker()
+    def test_假成功不發布exit事件(self, create_worker):
+        worker = create_worker()
         worker._position_manager.open_position("long", 21000.0)
 
         response = _make_response(data={"order_id": None, "message": "No position to exit"})
         worker._trading_client.place_exit_order.return_value = response
 
-        with patch.object(worker, "_publish_event") as mock_publish:
-            worker._place_exit(21050.0)
+        worker._place_exit(21050.0)
 
-            # 不應有 exit 事件
-            exit_calls = [
-                c for c in mock_publish.call_args_list
-                if c.args[0] == "exit"
-            ]
-            assert len(exit_calls) == 0
+        # 不應有 exit 事件
+        exit_calls = [
+            c for c in worker._publish_event.call_args_list
+            if c.args[0] == "exit"
+        ]
+        assert len(exit_calls) == 0
 
-    def test_假成功不呼叫risk_manager_on_exit(self):
-        worker = _create_worker()
+    def test_假成功不呼叫risk_manager_on_exit(self, create_worker):
+        worker = create_worker()
         worker._position_manager.open_position("long", 21000.0)
         worker._risk_manager.on_entry(21000.0, "long")
 
@@ -134,48 +191,46 @@ class TestPlaceExitFalseSuccess:
             worker._place_exit(21050.0)
             mock_on_exit.assert_not_called()
 
-    def test_真實成功正常執行(self):
-        worker = _create_worker()
+    def test_真實成功正常執行(self, create_worker):
+        worker = create_worker()
         worker._position_manager.open_position("long", 21000.0)
         worker._risk_manager.on_entry(21000.0, "long")
 
         response = _make_response(data={"order_id": "abc123", "code": "MXFA6"})
         worker._trading_client.place_exit_order.return_value = response
 
-        with patch.object(worker, "_publish_event") as mock_publish, \
-             patch.object(worker, "_save_order_history"):
-            worker._place_exit(21050.0)
+        worker._place_exit(21050.0)
 
-            # 真實成功：應發布 exit 事件
-            exit_calls = [
-                c for c in mock_publish.call_args_list
-                if c.args[0] == "exit"
-            ]
-            assert len(exit_calls) == 1
+        # 真實成功：應發布 exit 事件
+        exit_calls = [
+            c for c in worker._publish_event.call_args_list
+            if c.args[0] == "exit"
+        ]
+        assert len(exit_calls) == 1
 
-            # 真實成功：持倉應被清除
-            assert worker._position_manager.is_flat
+        # 真實成功：持倉應被清除
+        assert worker._position_manager.is_flat
 
 
 class TestSaveOrderHistory:
     """測試 _save_order_history 委託紀錄寫入"""
 
     @patch("strategy_worker.SessionLocal")
-    def test_進場寫入OrderHistory(self, mock_session_local):
-        mock_db = MagicMock()
-        mock_session_local.return_value = mock_db
+    def test_進場寫入OrderHistory(self, mock_session_local, create_worker):
+        db = _StubDB()
+        mock_session_local.return_value = db
 
-        worker = _create_worker()
+        worker = create_worker(stub_side_effects=False)
         result_data = {"order_id": "abc123", "code": "MXFA6", "seqno": "1", "ordno": "O1"}
 
         worker._save_order_history("long_entry", result_data, 21000.0)
 
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-        mock_db.close.assert_called_once()
+        assert len(db.added) == 1
+        assert db.commit_count == 1
+        assert db.close_count == 1
 
         # 驗證 OrderHistory 欄位
-        order = mock_db.add.call_args.args[0]
+        order = db.added[0]
         assert order.symbol == worker.settings.symbol
         assert order.action == "long_entry"
         assert order.order_id == "abc123"
@@ -183,39 +238,38 @@ class TestSaveOrderHistory:
         assert order.simulation == 1  # 預設模擬模式
 
     @patch("strategy_worker.SessionLocal")
-    def test_出場寫入OrderHistory(self, mock_session_local):
-        mock_db = MagicMock()
-        mock_session_local.return_value = mock_db
+    def test_出場寫入OrderHistory(self, mock_session_local, create_worker):
+        db = _StubDB()
+        mock_session_local.return_value = db
 
-        worker = _create_worker()
+        worker = create_worker(stub_side_effects=False)
         result_data = {"order_id": "def456", "code": "MXFA6"}
 
         worker._save_order_history("short_exit", result_data, 20900.0)
 
-        mock_db.add.assert_called_once()
-        order = mock_db.add.call_args.args[0]
+        assert len(db.added) == 1
+        order = db.added[0]
         assert order.action == "short_exit"
         assert order.order_id == "def456"
 
     @patch("strategy_worker.SessionLocal")
-    def test_DB錯誤不拋出例外(self, mock_session_local):
-        mock_db = MagicMock()
-        mock_db.commit.side_effect = Exception("DB connection lost")
-        mock_session_local.return_value = mock_db
+    def test_DB錯誤不拋出例外(self, mock_session_local, create_worker):
+        db = _StubDB(commit_error=Exception("DB connection lost"))
+        mock_session_local.return_value = db
 
-        worker = _create_worker()
+        worker = create_worker(stub_side_effects=False)
 
         # 不應拋出例外
         worker._save_order_history("long_entry", {"order_id": "abc"}, 21000.0)
 
-        mock_db.rollback.assert_called_once()
-        mock_db.close.assert_called_once()
+        assert db.rollback_count == 1
+        assert db.close_count == 1
 
     @patch("strategy_worker.SessionLocal")
-    def test_SessionLocal建立失敗不拋出例外(self, mock_session_local):
+    def test_SessionLocal建立失敗不拋出例外(self, mock_session_local, create_worker):
         mock_session_local.side_effect = Exception("Cannot connect to DB")
 
-        worker = _create_worker()
+        worker = create_worker(stub_side_effects=False)
 
         # 不應拋出例外
         worker._save_order_history("long_entry", {"order_id": "abc"}, 21000.0)
@@ -224,42 +278,38 @@ class TestSaveOrderHistory:
 class TestPlaceEntryOrderHistory:
     """測試 _place_entry 整合 OrderHistory"""
 
-    def test_進場成功呼叫save(self):
-        worker = _create_worker()
+    def test_進場成功呼叫save(self, create_worker):
+        worker = create_worker()
         worker._risk_manager.reset_daily()  # 確保風控允許交易
 
         response = _make_response(data={"order_id": "abc123", "code": "MXFA6"})
         worker._trading_client.place_entry_order.return_value = response
 
-        with patch.object(worker, "_save_order_history") as mock_save, \
-             patch.object(worker, "_publish_event"):
-            worker._place_entry("long", 21000.0)
+        worker._place_entry("long", 21000.0)
 
-            mock_save.assert_called_once_with(
-                "long_entry",
-                {"order_id": "abc123", "code": "MXFA6"},
-                21000.0,
-            )
+        worker._save_order_history.assert_called_once_with(
+            "long_entry",
+            {"order_id": "abc123", "code": "MXFA6"},
+            21000.0,
+        )
 
-    def test_進場失敗不呼叫save(self):
-        worker = _create_worker()
+    def test_進場失敗不呼叫save(self, create_worker):
+        worker = create_worker()
 
         response = _make_response(success=False, error="Order rejected")
         worker._trading_client.place_entry_order.return_value = response
 
-        with patch.object(worker, "_save_order_history") as mock_save:
-            worker._place_entry("long", 21000.0)
+        worker._place_entry("long", 21000.0)
 
-            mock_save.assert_not_called()
+        worker._save_order_history.assert_not_called()
 
-    def test_風控拒絕不呼叫save(self):
-        worker = _create_worker()
+    def test_風控拒絕不呼叫save(self, create_worker):
+        worker = create_worker()
         # 設定風控拒絕：直接設定 trading_halted
         worker._risk_manager.state.trading_halted = True
         worker._risk_manager.state.halt_reason = "daily_loss_limit"
 
-        with patch.object(worker, "_save_order_history") as mock_save:
-            worker._place_entry("long", 21000.0)
+        worker._place_entry("long", 21000.0)
 
-            mock_save.assert_not_called()
-            worker._trading_client.place_entry_order.assert_not_called()
+        worker._save_order_history.assert_not_called()
+        worker._trading_client.place_entry_order.assert_not_called()
@@ -9,6 +9,7 @@ TradingQueueClient 單元測試
 """
 import json
 import pytest
+import redis
 from unittest.mock import Mock, patch, MagicMock
 from dataclasses import asdict
 
@@ -23,6 +24,37 @@ from trading_queue import (
 )
 
 
+# redis.Redis 的屬性清單只分析一次，各測試建立 Mock 時直接作為 spec
+_REDIS_SPEC = dir(redis.Redis)
+
+
+# 測試中作為 blpop 返回值的成功回應，匯入時序列化一次
+_OK_JSON = TradingResponse(request_id="test", success=True).to_json()
+_OK_DATA_JSON = TradingResponse(request_id="test", success=True, data={}).to_json()
+_OK_SYMBOLS_JSON = TradingResponse(
+    request_id="mock-uuid", success=True, data={"symbols": ["MXF"]}
+).to_json()
+
+
+def _make_redis_mock(**config):
+    """建立以 redis.Redis 為 spec 的 Mock（拼錯方法名稱會拋出 AttributeError）"""
+    return Mock(spec=_REDIS_SPEC, **config)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patched_from_url():
+    """整個模組只替換一次 trading_queue.redis.from_url"""
+    with patch("trading_queue.redis.from_url") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_from_url(_patched_from_url):
+    """每個測試取得重設過呼叫紀錄與返回值的 redis.from_url Mock"""
+    _patched_from_url.reset_mock(return_value=True, side_effect=True)
+    return _patched_from_url
+
+
 class TestTradingRequest:
     """TradingRequest 資料類測試"""
 
@@ -129,11 +161,10 @@ class TestTradingResponse:
 class TestTradingQueueClientInit:
     """TradingQueueClient 初始化測試"""
 
-    @patch("trading_queue.redis.from_url")
     def test_初始化成功時應該建立連線(self, mock_from_url):
         """測試: 初始化成功時應該建立 Redis 連線"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
         mock_from_url.return_value = mock_redis
 
@@ -146,12 +177,10 @@ class TestTradingQueueClientInit:
         )
         mock_redis.ping.assert_called_once()
 
-    @patch("trading_queue.redis.from_url")
     def test_Redis連線失敗時應該拋出例外(self, mock_from_url):
         """測試: Redis 連線失敗時應該拋出 ConnectionError"""
         # Arrange
-        import redis
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.side_effect = redis.ConnectionError("Connection refused")
         mock_from_url.return_value = mock_redis
 
@@ -163,20 +192,14 @@ class TestTradingQueueClientInit:
 class TestTradingQueueClientSubmitRequest:
     """TradingQueueClient.submit_request 測試"""
 
-    @patch("trading_queue.redis.from_url")
     def test_submit_request_成功時應該返回回應(self, mock_from_url):
         """測試: submit_request 成功時應該返回 TradingResponse"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
 
         # 模擬成功的回應
-        expected_response = TradingResponse(
-            request_id="mock-uuid",
-            success=True,
-            data={"symbols": ["MXF"]},
-        )
-        mock_redis.blpop.return_value = ("key", expected_response.to_json())
+        mock_redis.blpop.return_value = ("key", _OK_SYMBOLS_JSON)
         mock_from_url.return_value = mock_redis
 
         client = TradingQueueClient()
@@ -193,11 +216,10 @@ class TestTradingQueueClientSubmitRequest:
         assert response.data == {"symbols": ["MXF"]}
         mock_redis.rpush.assert_called_once()
 
-    @patch("trading_queue.redis.from_url")
     def test_submit_request_超時時應該拋出TimeoutError(self, mock_from_url):
         """測試: submit_request 超時時應該拋出 TimeoutError"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
         mock_redis.blpop.return_value = None  # 超時返回 None
         mock_from_url.return_value = mock_redis
@@ -212,14 +234,12 @@ class TestTradingQueueClientSubmitRequest:
                 timeout=1,
             )
 
-    @patch("trading_queue.redis.from_url")
     def test_submit_request_連線錯誤時應該拋出ConnectionError(self, mock_from_url):
         """測試: submit_request 連線錯誤時應該拋出 ConnectionError"""
         # Arrange
-        import redis as redis_lib
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
-        mock_redis.rpush.side_effect = redis_lib.ConnectionError("Connection lost")
+        mock_redis.rpush.side_effect = redis.ConnectionError("Connection lost")
         mock_from_url.return_value = mock_redis
 
         client = TradingQueueClient()
@@ -228,16 +248,12 @@ class TestTradingQueueClientSubmitRequest:
         with pytest.raises(ConnectionError, match="Failed to communicate"):
             client.submit_request(TradingOperation.PING, simulation=True)
 
-    @patch("trading_queue.redis.from_url")
     def test_submit_request_應該正確傳遞參數(self, mock_from_url):
         """測試: submit_request 應該正確將參數傳遞到 Redis 隊列"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
-        mock_redis.blpop.return_value = (
-            "key",
-            TradingResponse(request_id="test", success=True).to_json(),
-        )
+        mock_redis.blpop.return_value = ("key", _OK_JSON)
         mock_from_url.return_value = mock_redis
 
         client = TradingQueueClient()
@@ -265,16 +281,12 @@ class TestTradingQueueClientSubmitRequest:
 class TestTradingQueueClientHealthCheck:
     """TradingQueueClient.check_worker_health 測試"""
 
-    @patch("trading_queue.redis.from_url")
     def test_check_worker_health_Worker健康時應該返回True(self, mock_from_url):
         """測試: Worker 健康時 check_worker_health 應該返回 True"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
-        mock_redis.blpop.return_value = (
-            "key",
-            TradingResponse(request_id="test", success=True).to_json(),
-        )
+        mock_redis.blpop.return_value = ("key", _OK_JSON)
         mock_from_url.return_value = mock_redis
 
         client = TradingQueueClient()
@@ -285,11 +297,10 @@ class TestTradingQueueClientHealthCheck:
         # Assert
         assert result is True
 
-    @patch("trading_queue.redis.from_url")
     def test_check_worker_health_超時時應該返回False(self, mock_from_url):
         """測試: Worker 超時時 check_worker_health 應該返回 False"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
         mock_redis.blpop.return_value = None  # 超時
         mock_from_url.return_value = mock_redis
@@ -302,14 +313,12 @@ class TestTradingQueueClientHealthCheck:
         # Assert
         assert result is False
 
-    @patch("trading_queue.redis.from_url")
     def test_check_worker_health_連線錯誤時應該返回False(self, mock_from_url):
         """測試: 連線錯誤時 check_worker_health 應該返回 False"""
         # Arrange
-        import redis as redis_lib
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
-        mock_redis.rpush.side_effect = redis_lib.ConnectionError("Connection lost")
+        mock_redis.rpush.side_effect = redis.ConnectionError("Connection lost")
         mock_from_url.return_value = mock_redis
 
         client = TradingQueueClient()
@@ -324,58 +333,80 @@ class TestTradingQueueClientHealthCheck:
 class TestTradingQueueClientOperations:
     """TradingQueueClient 各種操作方法測試"""
 
-    @patch("trading_queue.redis.from_url")
-    def setup_method(self, method, mock_from_url=None):
-        """每個測試前的準備工作"""
-        # 這個方法會在每個測試方法前被調用
-        pass
-
     def _create_mock_client(self, mock_from_url):
-        """建立 Mock 客戶端的輔助方法"""
-        mock_redis = Mock()
-        mock_redis.ping.return_value = True
-        mock_redis.blpop.return_value = (
-            "key",
-            TradingResponse(request_id="test", success=True, data={}).to_json(),
-        )
-        mock_from_url.return_value = mock_redis
-        return TradingQueueClient(), mock_redis
+        """建立 Mock 客戶端的輔助方法
 
-    @patch("trading_queue.redis.from_url")
-    def test_get_symbols_應該調用正確的操作(self, mock_from_url):
-        """測試: get_symbols 應該使用 GET_SYMBOLS 操作"""
-        # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        每次建立新的 Mock：copy.copy 複製的 Mock 會共用 rpush 等子 Mock，
+        呼叫紀錄會在測試間互相累積。
 
-        # Act
-        client.get_symbols(simulation=True)
+        Returns:
+            (client, mock_redis, sent_requests)；sent_requests 依序收集
+            rpush 送出並解析後的請求字典
+        """
+        sent_requests = []
 
-        # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.GET_SYMBOLS.value
+        def capture_rpush(queue, payload):
+            sent_requests.append(json.loads(payload))
+            return len(sent_requests)
 
-    @patch("trading_queue.redis.from_url")
-    def test_get_symbol_info_應該傳遞symbol參數(self, mock_from_url):
-        """測試: get_symbol_info 應該正確傳遞 symbol 參數"""
+        mock_redis = _make_redis_mock(**{
+            "ping.return_value": True,
+            "blpop.return_value": ("key", _OK_DATA_JSON),
+            "rpush.side_effect": capture_rpush,
+        })
+        mock_from_url.return_value = mock_redis
+        return TradingQueueClient(), mock_redis, sent_requests
+
+    @pytest.mark.parametrize(
+        "method_name, kwargs, operation, expected_params",
+        [
+            ("get_symbols", {"simulation": True}, TradingOperation.GET_SYMBOLS, {}),
+            (
+                "get_symbol_info",
+                {"symbol": "TXFJ5", "simulation": False},
+                TradingOperation.GET_SYMBOL_INFO,
+                {"symbol": "TXFJ5"},
+            ),
+            (
+                "get_snapshot",
+                {"symbol": "MXFJ5", "simulation": True},
+                TradingOperation.GET_SNAPSHOT,
+                {"symbol": "MXFJ5"},
+            ),
+            ("get_positions", {"simulation": False}, TradingOperation.GET_POSITIONS, {}),
+            ("get_margin", {"simulation": True}, TradingOperation.GET_MARGIN, {}),
+            ("list_trades", {"simulation": True}, TradingOperation.LIST_TRADES, {}),
+        ],
+        ids=[
+            "get_symbols應該調用正確的操作",
+            "get_symbol_info應該傳遞symbol參數",
+            "get_snapshot應該傳遞symbol參數",
+            "get_positions應該調用正確的操作",
+            "get_margin應該調用正確的操作",
+            "list_trades應該調用正確的操作",
+        ],
+    )
+    def test_查詢操作應該送出對應的請求(
+        self, mock_from_url, method_name, kwargs, operation, expected_params
+    ):
+        """測試: 各查詢方法應該使用對應的 TradingOperation 並傳遞參數"""
         # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        client, mock_redis, sent_requests = self._create_mock_client(mock_from_url)
 
         # Act
-        client.get_symbol_info(symbol="TXFJ5", simulation=False)
+        getattr(client, method_name)(**kwargs)
 
         # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.GET_SYMBOL_INFO.value
-        assert request_data["params"]["symbol"] == "TXFJ5"
-        assert request_data["simulation"] is False
+        request_data = sent_requests[-1]
+        assert request_data["operation"] == operation.value
+        assert request_data["simulation"] is kwargs["simulation"]
+        for key, value in expected_params.items():
+            assert request_data["params"][key] == value
 
-    @patch("trading_queue.redis.from_url")
     def test_place_entry_order_應該傳遞所有必要參數(self, mock_from_url):
         """測試: place_entry_order 應該正確傳遞所有交易參數"""
         # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        client, mock_redis, sent_requests = self._create_mock_client(mock_from_url)
 
         # Act
         client.place_entry_order(
@@ -388,8 +419,7 @@ class TestTradingQueueClientOperations:
         )
 
         # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
+        request_data = sent_requests[-1]
         assert request_data["operation"] == TradingOperation.PLACE_ENTRY_ORDER.value
         assert request_data["params"]["symbol"] == "MXFJ5"
         assert request_data["params"]["quantity"] == 1
@@ -397,11 +427,10 @@ class TestTradingQueueClientOperations:
         assert request_data["params"]["price_type"] == "LMT"
         assert request_data["params"]["price"] == 21000.0
 
-    @patch("trading_queue.redis.from_url")
     def test_place_entry_order_市價單不應該包含price(self, mock_from_url):
         """測試: 市價單的 place_entry_order 不應該包含 price 參數"""
         # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        client, mock_redis, sent_requests = self._create_mock_client(mock_from_url)
 
         # Act
         client.place_entry_order(
@@ -414,16 +443,14 @@ class TestTradingQueueClientOperations:
         )
 
         # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
+        request_data = sent_requests[-1]
         assert "price" not in request_data["params"]
         assert request_data["params"]["price_type"] == "MKT"
 
-    @patch("trading_queue.redis.from_url")
     def test_place_exit_order_應該傳遞所有必要參數(self, mock_from_url):
         """測試: place_exit_order 應該正確傳遞平倉參數"""
         # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        client, mock_redis, sent_requests = self._create_mock_client(mock_from_url)
 
         # Act
         client.place_exit_order(
@@ -435,19 +462,17 @@ class TestTradingQueueClientOperations:
         )
 
         # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
+        request_data = sent_requests[-1]
         assert request_data["operation"] == TradingOperation.PLACE_EXIT_ORDER.value
         assert request_data["params"]["symbol"] == "MXFJ5"
         assert request_data["params"]["position_direction"] == "Buy"
         assert request_data["params"]["price_type"] == "LMT"
         assert request_data["params"]["price"] == 21500.0
 
-    @patch("trading_queue.redis.from_url")
     def test_check_order_status_應該使用較長的超時時間(self, mock_from_url):
         """測試: check_order_status 應該使用 60 秒超時"""
         # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
+        client, mock_redis, sent_requests = self._create_mock_client(mock_from_url)
 
         # Act
         client.check_order_status(
@@ -461,74 +486,15 @@ class TestTradingQueueClientOperations:
         blpop_call = mock_redis.blpop.call_args
         assert blpop_call[1]["timeout"] == 60
 
-    @patch("trading_queue.redis.from_url")
-    def test_get_snapshot_應該傳遞symbol參數(self, mock_from_url):
-        """測試: get_snapshot 應該正確傳遞 symbol 參數"""
-        # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
-
-        # Act
-        client.get_snapshot(symbol="MXFJ5", simulation=True)
-
-        # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.GET_SNAPSHOT.value
-        assert request_data["params"]["symbol"] == "MXFJ5"
-
-    @patch("trading_queue.redis.from_url")
-    def test_get_positions_應該調用正確的操作(self, mock_from_url):
-        """測試: get_positions 應該使用 GET_POSITIONS 操作"""
-        # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
-
-        # Act
-        client.get_positions(simulation=False)
-
-        # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.GET_POSITIONS.value
-        assert request_data["simulation"] is False
-
-    @patch("trading_queue.redis.from_url")
-    def test_get_margin_應該調用正確的操作(self, mock_from_url):
-        """測試: get_margin 應該使用 GET_MARGIN 操作"""
-        # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
-
-        # Act
-        client.get_margin(simulation=True)
-
-        # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.GET_MARGIN.value
-
-    @patch("trading_queue.redis.from_url")
-    def test_list_trades_應該調用正確的操作(self, mock_from_url):
-        """測試: list_trades 應該使用 LIST_TRADES 操作"""
-        # Arrange
-        client, mock_redis = self._create_mock_client(mock_from_url)
-
-        # Act
-        client.list_trades(simulation=True)
-
-        # Assert
-        request_json = mock_redis.rpush.call_args[0][1]
-        request_data = json.loads(request_json)
-        assert request_data["operation"] == TradingOperation.LIST_TRADES.value
-
 
 class TestGetQueueClient:
     """get_queue_client 單例函數測試"""
 
     @patch("trading_queue._queue_client", None)
-    @patch("trading_queue.redis.from_url")
     def test_get_queue_client_應該返回單例實例(self, mock_from_url):
         """測試: get_queue_client 應該返回同一個實例"""
         # Arrange
-        mock_redis = Mock()
+        mock_redis = _make_redis_mock()
         mock_redis.ping.return_value = True
         mock_from_url.return_value = mock_redis
 